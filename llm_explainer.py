@@ -1,15 +1,20 @@
 """
 LLM Equivalence Explainer
 
-Takes the JSON comparison result from pdf_compare22.py and uses GPT-4o
-to generate a human-readable explanation suitable for business stakeholders.
+Takes the JSON comparison result from pdf_compare22.py and uses an OpenAI
+chat model (GPT-4o-mini by default) to generate a human-readable explanation
+suitable for business stakeholders.
 
 Usage:
     python llm_explainer.py <comparison_result.json>
     python llm_explainer.py --json '{"status": "Fail", ...}'
+    python llm_explainer.py <comparison_result.json> --model gpt-4o
 
 Environment:
     OPENAI_API_KEY - Required OpenAI API key (can be set in .env file)
+    LLM_EXPLAINER_CACHE - Optional explanation cache directory (default: .llm_cache next to this script)
+    OPENAI_EXPLAINER_MODEL - Optional model name, e.g. a fine-tuned gpt-4o-mini (default: gpt-4o-mini)
+    OPENAI_SERVICE_TIER - Optional service tier for synchronous calls, e.g. "priority" for lower latency
 
 Output:
     <input_name>_summary.txt - Human-readable explanation (saved in same folder as input)
@@ -18,6 +23,9 @@ Output:
 import os
 import sys
 import json
+import time
+import asyncio
+import hashlib
 import argparse
 from pathlib import Path
 
@@ -28,142 +36,397 @@ try:
 except ImportError:
     pass  # dotenv not installed, will use system env vars
 
+# Try to import orjson (optional, faster JSON parsing/serialization)
 try:
-    from openai import OpenAI
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from openai import OpenAI, AsyncOpenAI
 except ImportError:
     print("Error: openai package not installed. Run: pip install openai")
     sys.exit(1)
 
 
-# GPT-4o System Prompt - Embedded directly in code
-SYSTEM_PROMPT = """You are an AI system used ONLY for explaining equivalence check results.
-You MUST NOT perform any numeric comparison or calculations.
-
-PROJECT CONTEXT:
-- Two PDF documents (old system vs new system) have already been compared using deterministic Python logic.
-- The comparison tool supports both selectable text and OCR (Optical Character Recognition) for scanned documents.
-- All numeric differences have already been detected and verified.
-- Your task is ONLY to explain the comparison result in clear, business-friendly language.
-- This output is used for client demos and sales presentations.
-
-IMPORTANT RULES (MANDATORY):
-1. Do NOT re-calculate, re-verify, or question the numbers.
-2. Do NOT assume missing data.
-3. Do NOT add new differences.
-4. Base your explanation ONLY on the provided JSON input.
-5. Be concise, professional, and easy to understand for non-technical stakeholders.
-
-INPUT:
-You will receive a JSON object with the following structure:
-{
-  "status": "OK" | "Fail",
-  "total_differences": <number>,
-  "ocr_used": {
-    "pdf1_ocr_pages": <number>,
-    "pdf2_ocr_pages": <number>
-  },
-  "differences": [
-    {
-      "page": <page_number>,
-      "line": <line_number>,
-      "old": "<old_value>",
-      "new": "<new_value>",
-      "source": "text" | "ocr",
-      "context": "<label or field name>"  // Optional - describes what the number represents
-    }
-  ],
-  "diff_pdf": "<path_to_highlighted_pdf>"
-}
+# System Prompt - Embedded directly in code
+SYSTEM_PROMPT = """Explain a PDF equivalence check result (old vs new system output) for business stakeholders. The numbers were already compared by deterministic code.
+
+Input: {"status":"OK"|"Fail","total_differences":n,"ocr_used":{"pdf1_ocr_pages":n,"pdf2_ocr_pages":n},"differences":[{"old","new","context"?}],"truncated"?}
+context = field label; truncated = only the first differences are listed.
+
+Rules:
+1. Use only the input; never recalculate, question or invent values.
+2. Start with "Equivalence Check Result: PASSED" or "Equivalence Check Result: FAILED".
+3. Summarize the findings; mention OCR pages (scanned content) if any.
+4. List each difference as "- <context> changed from <old> to <new>."; translate non-English context in parentheses, e.g. "合計 (Total)"; without context, name the value type (date, amount...). Group related items.
+5. End with a one-sentence business conclusion on approval.
+6. Plain text only; no JSON, markdown or emojis."""
+
+# Model used for explanations. The task is narrow and templated, so the small
+# model is sufficient; set OPENAI_EXPLAINER_MODEL to use another (or fine-tuned) model.
+DEFAULT_MODEL = os.environ.get("OPENAI_EXPLAINER_MODEL", "gpt-4o-mini")
+
+# Optional service tier (e.g. "priority") for synchronous/async calls; not part of the cache key
+SERVICE_TIER = os.environ.get("OPENAI_SERVICE_TIER")
+
+# Maximum number of differences sent to the model; the rest are summarized by the count
+MAX_PROMPT_DIFFERENCES = 100
+
+# On-disk cache of generated explanations, keyed by the request content
+CACHE_DIR = Path(os.environ.get("LLM_EXPLAINER_CACHE", Path(__file__).parent / ".llm_cache"))
 
-FIELD EXPLANATIONS:
-- "source": "text" means the value was extracted from selectable text in the PDF
-- "source": "ocr" means the value was extracted using OCR from scanned/image content
-- "ocr_used" shows how many pages required OCR processing in each document
-- "context": IMPORTANT - This is the field label or nearby text that describes what the number represents.
-  Use this to make your explanation more meaningful!
 
-YOUR TASK:
-Generate a clear explanation covering:
+# OpenAI clients by API key, reused so calls share one HTTP connection pool
+_clients = {}
 
-1. Final equivalence judgment:
-   - Clearly state whether the documents are equivalent or not.
 
-2. Summary of findings:
-   - If status is "OK": confirm that all values match.
-   - If status is "Fail": explain that differences were detected.
-   - Mention if OCR was used for any pages (this indicates scanned/image content).
+def _get_client(api_key: str = None) -> "OpenAI":
+    """Return the shared OpenAI client for an API key, creating it on first use."""
+    api_key = api_key or os.environ.get("OPENAI_API_KEY")
+    client = _clients.get(api_key)
+    if client is None:
+        client = _clients[api_key] = OpenAI(api_key=api_key)
+    return client
 
-3. Difference explanation:
-   - List the differences in simple bullet points.
-   - ALWAYS use the "context" field if available to name what changed.
-   - IMPORTANT: If the context is in Japanese or another non-English language, ALWAYS provide an English translation in parentheses.
-     Example: "仕様 策定 (Specification Formulation) changed from X to Y"
-     Example: "テック 小 計 (Tech Subtotal) changed from X to Y"
-     Example: "フロント エンド 開発 (Frontend Development) changed from X to Y"
-   - If context appears fragmented or unclear, interpret it as best as you can and provide an English explanation.
-   - If no context is available, describe the type of value if recognizable (date, amount, count, etc.).
-   - Mention old value vs new value.
-   - Group related differences when possible.
-   - Do NOT mention page or line numbers unless necessary.
 
-4. Business conclusion:
-   - Explain what this means from a system validation perspective.
-   - Use wording suitable for payroll / insurance / invoice / enterprise systems.
+def _call_options() -> dict:
+    """Per-call options that don't change the generated text."""
+    return {"service_tier": SERVICE_TIER} if SERVICE_TIER else {}
 
-OUTPUT FORMAT (STRICT):
-Return plain text only.
-Do NOT return JSON.
-Do NOT include markdown.
-Do NOT include emojis.
 
-EXAMPLE OUTPUT STYLE (with context and translations):
+def _dumps(obj) -> str:
+    """Serialize to compact JSON (UTF-8, not ASCII-escaped), using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False)
 
-"Equivalence Check Result: FAILED
 
-The comparison between the legacy system output and the new system output identified multiple numerical differences.
+def _loads(data):
+    """Parse JSON text or bytes, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
 
-Key differences include:
-- 仕様 策定 (Specification Formulation) changed from 10 hours to 2 hours.
-- フロント エンド 開発 (Frontend Development) changed from 20 hours to 1 hour.
-- テック 小 計 (Tech Subtotal) changed from 2,035,000 to 2,421,000.
-- 合計 (Total) changed from 2,238,500 to 2,663,100.
 
-Due to these discrepancies, the new system output is not equivalent to the legacy system output and requires further review before approval."
+def _compact_payload(comparison_json: dict) -> dict:
+    """
+    Reduce a comparison result to the fields the explanation actually uses.
+    
+    Page/line numbers, extraction source and the diff PDF path are dropped,
+    and the differences list is capped at MAX_PROMPT_DIFFERENCES entries.
+    """
+    differences = comparison_json.get("differences", [])
+    
+    payload = {
+        "status": comparison_json.get("status"),
+        "total_differences": comparison_json.get("total_differences", len(differences)),
+    }
+    if "ocr_used" in comparison_json:
+        payload["ocr_used"] = comparison_json["ocr_used"]
+    
+    compact_diffs = []
+    for diff in differences[:MAX_PROMPT_DIFFERENCES]:
+        entry = {"old": diff.get("old"), "new": diff.get("new")}
+        if diff.get("context"):
+            entry["context"] = diff["context"]
+        compact_diffs.append(entry)
+    payload["differences"] = compact_diffs
+    
+    if len(differences) > MAX_PROMPT_DIFFERENCES:
+        payload["truncated"] = True
+    
+    return payload
 
-Now generate the explanation based strictly on the provided input JSON."""
 
 
+def _build_request_body(comparison_json: dict, model: str = DEFAULT_MODEL) -> dict:
+    """Build the chat completion request body for one comparison result."""
+    # Prepare user message with compact JSON input (no indentation, no \\u escapes)
+    payload = _dumps(_compact_payload(comparison_json))
+    user_message = f"Comparison result JSON:\n{payload}"
+    
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_message}
+        ],
+        "temperature": 0.3,  # Lower temperature for consistent, professional output
+        "max_tokens": 350  # Explanations are ~150-300 tokens; a tight cap keeps latency down
+    }
 
 
-def generate_explanation(comparison_json: dict, api_key: str = None) -> str:
+def _no_difference_explanation(comparison_json: dict) -> str:
+    """Canned explanation for a passing comparison (no API call needed)."""
+    ocr_used = comparison_json.get("ocr_used", {})
+    ocr_pages = ocr_used.get("pdf1_ocr_pages", 0) + ocr_used.get("pdf2_ocr_pages", 0)
+    
+    lines = [
+        "Equivalence Check Result: PASSED",
+        "",
+        "The comparison between the legacy system output and the new system output "
+        "found no numerical differences. All values match."
+    ]
+    if ocr_pages:
+        lines.append("")
+        lines.append("Some pages contained scanned or image content and were read using OCR.")
+    lines.append("")
+    lines.append("The new system output is equivalent to the legacy system output "
+                 "and can be approved without further review.")
+    return "\n".join(lines)
+
+
+def _cache_path(request_body: dict) -> Path:
+    """Cache file for a request, keyed by the canonicalized request body."""
+    canonical = json.dumps(request_body, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    key = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    return CACHE_DIR / f"{key}.txt"
+
+
+def _lookup_explanation(comparison_json: dict, request_body: dict):
+    """Return a known explanation without calling the API, or None."""
+    if comparison_json.get("status") == "OK" and comparison_json.get("total_differences") == 0:
+        return _no_difference_explanation(comparison_json)
+    
+    cache_path = _cache_path(request_body)
+    if cache_path.exists():
+        return cache_path.read_text(encoding="utf-8")
+    return None
+
+
+def _store_explanation(request_body: dict, explanation: str) -> None:
+    """Write an explanation to the cache (best effort)."""
+    if not explanation:
+        return
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cache_path = _cache_path(request_body)
+        tmp_path = cache_path.with_suffix(".tmp")
+        tmp_path.write_text(explanation, encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Warning: could not write explanation cache: {e}")
+
+
+def generate_explanation(
+    comparison_json: dict,
+    api_key: str = None,
+    stream: bool = False,
+    model: str = DEFAULT_MODEL
+) -> str:
     """
-    Generate a human-readable explanation using GPT-4o.
+    Generate a human-readable explanation using an OpenAI chat model.
     
     Args:
         comparison_json: The JSON result from pdf_compare22.py
         api_key: Optional OpenAI API key (uses env var if not provided)
+        stream: Write tokens to stdout as they arrive instead of waiting
+                for the full completion
+        model: Chat model to use (default: DEFAULT_MODEL)
     
     Returns:
         Human-readable explanation text
     """
-    # Initialize OpenAI client
-    client = OpenAI(api_key=api_key or os.environ.get("OPENAI_API_KEY"))
+    request_body = _build_request_body(comparison_json, model)
     
-    # Prepare user message with JSON input
-    user_message = f"Here is the comparison result JSON:\n\n{json.dumps(comparison_json, indent=2)}"
+    # Passing comparisons and repeated inputs never reach the API
+    cached = _lookup_explanation(comparison_json, request_body)
+    if cached is not None:
+        if stream:
+            sys.stdout.write(cached + "\n")
+            sys.stdout.flush()
+        return cached
     
-    # Call GPT-4o
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": user_message}
-        ],
-        temperature=0.3,  # Lower temperature for consistent, professional output
-        max_tokens=1000
+    # Call the model (the client and its connections are reused across calls)
+    client = _get_client(api_key)
+    response = client.chat.completions.create(**request_body, **_call_options(), stream=stream)
+    
+    if not stream:
+        explanation = response.choices[0].message.content
+        _store_explanation(request_body, explanation)
+        return explanation
+    
+    # Print each delta as soon as it arrives and keep the full text
+    parts = []
+    for chunk in response:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            sys.stdout.write(delta)
+            sys.stdout.flush()
+            parts.append(delta)
+    sys.stdout.write("\n")
+    sys.stdout.flush()
+    
+    explanation = "".join(parts)
+    _store_explanation(request_body, explanation)
+    return explanation
+
+
+async def generate_explanation_async(
+    comparison_json: dict,
+    client: "AsyncOpenAI",
+    model: str = DEFAULT_MODEL
+) -> str:
+    """
+    Async variant of generate_explanation using a shared AsyncOpenAI client.
+    
+    Args:
+        comparison_json: The JSON result from pdf_compare22.py
+        client: AsyncOpenAI client (reused across concurrent requests)
+        model: Chat model to use (default: DEFAULT_MODEL)
+    
+    Returns:
+        Human-readable explanation text
+    """
+    request_body = _build_request_body(comparison_json, model)
+    
+    cached = _lookup_explanation(comparison_json, request_body)
+    if cached is not None:
+        return cached
+    
+    response = await client.chat.completions.create(**request_body, **_call_options())
+    
+    explanation = response.choices[0].message.content
+    _store_explanation(request_body, explanation)
+    return explanation
+
+
+async def generate_explanations_async(
+    comparison_jsons: list,
+    api_key: str = None,
+    max_concurrency: int = 10,
+    model: str = DEFAULT_MODEL
+) -> list:
+    """
+    Generate explanations for many comparison results concurrently.
+    
+    Requests overlap on the network instead of running one after another;
+    the semaphore keeps at most `max_concurrency` of them in flight to stay
+    within the account's rate limits. Rate-limit (429) and server (5xx)
+    errors are retried by the client with exponential backoff, honouring
+    the retry-after header.
+    
+    Args:
+        comparison_jsons: List of JSON results from pdf_compare22.py
+        api_key: Optional OpenAI API key (uses env var if not provided)
+        max_concurrency: Maximum number of requests in flight
+        model: Chat model to use (default: DEFAULT_MODEL)
+    
+    Returns:
+        List of explanation texts in input order. A request that still fails
+        after retries yields its exception instead of a string.
+    """
+    client = AsyncOpenAI(api_key=api_key or os.environ.get("OPENAI_API_KEY"), max_retries=5)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def bounded(comparison_json):
+        async with semaphore:
+            return await generate_explanation_async(comparison_json, client, model)
+    
+    try:
+        return await asyncio.gather(
+            *[bounded(comparison_json) for comparison_json in comparison_jsons],
+            return_exceptions=True
+        )
+    finally:
+        await client.close()
+
+
+def generate_explanations_batch(
+    comparison_jsons: list,
+    custom_ids: list = None,
+    api_key: str = None,
+    poll_interval: float = 30.0,
+    model: str = DEFAULT_MODEL
+) -> list:
+    """
+    Generate explanations for many comparison results with one Batch API job.
+    
+    All requests are uploaded as a single JSONL file and processed by OpenAI's
+    Batch API (completion window: 24h), which is billed at half the price of
+    synchronous calls. This call blocks until the batch finishes.
+    
+    Args:
+        comparison_jsons: List of JSON results from pdf_compare22.py
+        custom_ids: Optional unique id per result (e.g. sample names),
+                    defaults to "request-<index>"
+        api_key: Optional OpenAI API key (uses env var if not provided)
+        poll_interval: Seconds to wait between batch status checks
+        model: Chat model to use (default: DEFAULT_MODEL)
+    
+    Returns:
+        List of explanation texts in input order (None for failed requests)
+    """
+    if custom_ids is None:
+        custom_ids = [f"request-{i}" for i in range(len(comparison_jsons))]
+    if len(custom_ids) != len(comparison_jsons):
+        raise ValueError("custom_ids must have one entry per comparison result")
+    
+    # Answer passing and previously seen comparisons from the cache
+    explanations = {}
+    request_bodies = {}
+    for custom_id, comparison_json in zip(custom_ids, comparison_jsons):
+        request_body = _build_request_body(comparison_json, model)
+        cached = _lookup_explanation(comparison_json, request_body)
+        if cached is not None:
+            explanations[custom_id] = cached
+        else:
+            request_bodies[custom_id] = request_body
+    
+    if not request_bodies:
+        return [explanations[custom_id] for custom_id in custom_ids]
+    
+    client = _get_client(api_key)
+    
+    # One JSONL line per chat completion request
+    lines = []
+    for custom_id, request_body in request_bodies.items():
+        lines.append(_dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": request_body
+        }))
+    
+    batch_file = client.files.create(
+        file=("explanations.jsonl", "\n".join(lines).encode("utf-8")),
+        purpose="batch"
+    )
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
     )
+    print(f"Submitted batch {batch.id} with {len(lines)} request(s)")
+    
+    # Poll until the batch reaches a terminal state
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch.id)
+        print(f"  Batch {batch.id}: {batch.status}")
+    
+    if batch.status != "completed":
+        raise RuntimeError(f"Batch {batch.id} did not complete (status: {batch.status})")
+    
+    # Map results back by custom_id (output order is not guaranteed)
+    if batch.output_file_id:
+        output = client.files.content(batch.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            result = _loads(line)
+            response = result.get("response") or {}
+            if response.get("status_code") == 200:
+                custom_id = result["custom_id"]
+                explanation = response["body"]["choices"][0]["message"]["content"]
+                explanations[custom_id] = explanation
+                _store_explanation(request_bodies[custom_id], explanation)
     
-    return response.choices[0].message.content
+    return [explanations.get(custom_id) for custom_id in custom_ids]
 
 
 def save_explanation(explanation: str, output_path: str = "equivalence_summary.txt") -> None:
@@ -198,6 +461,12 @@ def main():
         type=str,
         help="OpenAI API key (or set OPENAI_API_KEY env var)"
     )
+    parser.add_argument(
+        "--model",
+        type=str,
+        default=DEFAULT_MODEL,
+        help=f"Chat model to use (default: {DEFAULT_MODEL}, or set OPENAI_EXPLAINER_MODEL)"
+    )
     
     args = parser.parse_args()
     
@@ -211,11 +480,11 @@ def main():
     # Load comparison JSON
     input_path = None
     if args.json:
-        comparison_data = json.loads(args.json)
+        comparison_data = _loads(args.json)
     elif args.input:
         input_path = Path(args.input)
-        with open(input_path, "r", encoding="utf-8") as f:
-            comparison_data = json.load(f)
+        with open(input_path, "rb") as f:
+            comparison_data = _loads(f.read())
     else:
         print("Error: Provide JSON file path or use --json for inline JSON")
         parser.print_help()
@@ -230,18 +499,11 @@ def main():
     else:
         output_path = "equivalence_summary.txt"
     
-    print("Generating explanation using GPT-4o...")
+    print(f"Generating explanation using {args.model}...")
     print()
     
-    # Generate explanation
-    explanation = generate_explanation(comparison_data, api_key)
-    
-    # Print to console
-    print("=" * 60)
-    print("EQUIVALENCE EXPLANATION")
-    print("=" * 60)
-    print(explanation)
-    print("=" * 60)
+    # Generate explanation (streamed to the console as it is generated)
+    explanation = generate_explanation(comparison_data, api_key, stream=True, model=args.model)
     print()
     
     # Save to file
@@ -5,7 +5,13 @@ This script scans the samples folder and runs the PDF comparison pipeline
 on all sample pairs automatically.
 
 Usage:
-    python orchestrator.py [--user-type org|byok]
+    python orchestrator.py [--user-type org|byok] [--batch-api]
+
+Options:
+    --batch-api    Generate all explanations with one OpenAI Batch API job
+                   (half price, but results can take up to 24h). By default
+                   explanations are requested concurrently once every
+                   comparison has finished.
 
 Output:
     Each sample folder will get:
@@ -15,14 +21,34 @@ Output:
 """
 
 import os
+import re
 import sys
 import time
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 # Add current directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from run_pipeline import run_pipeline
+from llm_explainer import (
+    generate_explanations_async,
+    generate_explanations_batch,
+    save_explanation,
+)
+
+# Generated output PDFs that must not be picked up as inputs
+_OUTPUT_NAME_RE = re.compile(r'comparison|highlighted|diff', re.IGNORECASE)
+
+# Filename markers for PDF1 (old/baseline): _a, _A, old, parent, _01, 01_
+_OLD_NAME_RE = re.compile(r'_a|old|parent|_01|01_', re.IGNORECASE)
+# Filename markers for PDF2 (new): _b, _B, new, child, _02, 02_
+_NEW_NAME_RE = re.compile(r'_b|new|child|_02|02_', re.IGNORECASE)
+
+# Filename endings checked when the markers above don't identify both PDFs
+_OLD_SUFFIX_RE = re.compile(r'(?:_[aA]|1)$')
+_NEW_SUFFIX_RE = re.compile(r'(?:_[bB]|2)$')
 
 
 def find_pdf_pairs(samples_dir: Path) -> list:
@@ -40,9 +66,7 @@ def find_pdf_pairs(samples_dir: Path) -> list:
         # Find all PDF files in this sample directory (exclude output files)
         pdf_files = [
             f for f in sample_dir.glob('*.pdf') 
-            if 'comparison' not in f.name.lower() 
-            and 'highlighted' not in f.name.lower()
-            and 'diff' not in f.name.lower()
+            if not _OUTPUT_NAME_RE.search(f.name)
         ]
         
         if len(pdf_files) < 2:
@@ -56,15 +80,9 @@ def find_pdf_pairs(samples_dir: Path) -> list:
         pdf1, pdf2 = None, None
         
         for pdf in pdf_files:
-            name_lower = pdf.stem.lower()
-            
-            # Patterns for PDF1 (old/baseline):
-            # _a, _A, old, parent, _01, 01_, 1_
-            if any(x in name_lower for x in ['_a', 'old', 'parent', '_01', '01_']):
+            if _OLD_NAME_RE.search(pdf.stem):
                 pdf1 = pdf
-            # Patterns for PDF2 (new):
-            # _b, _B, new, child, _02, 02_, 2_
-            elif any(x in name_lower for x in ['_b', 'new', 'child', '_02', '02_']):
+            elif _NEW_NAME_RE.search(pdf.stem):
                 pdf2 = pdf
         
         # If pattern matching didn't work, use alphabetical order
@@ -72,10 +90,10 @@ def find_pdf_pairs(samples_dir: Path) -> list:
             # One more check - look at the end of filenames
             for pdf in pdf_files:
                 name = pdf.stem
-                if name.endswith('_A') or name.endswith('_a') or name.endswith('1'):
+                if _OLD_SUFFIX_RE.search(name):
                     if 'new' not in name.lower():  # Don't match "new1"
                         pdf1 = pdf
-                elif name.endswith('_B') or name.endswith('_b') or name.endswith('2'):
+                elif _NEW_SUFFIX_RE.search(name):
                     if 'old' not in name.lower():  # Don't match "old2"
                         pdf2 = pdf
         
@@ -90,7 +108,59 @@ def find_pdf_pairs(samples_dir: Path) -> list:
 
 
 
-def run_all_samples(user_type: str = "org"):
+def explain_all(completed: list, use_batch_api: bool = False) -> None:
+    """
+    Generate explanations for all finished comparisons in one go.
+    
+    Args:
+        completed: List of (sample_name, pipeline_result) tuples
+        use_batch_api: Submit one Batch API job instead of concurrent requests
+    """
+    if not completed:
+        return
+    
+    if not os.environ.get("OPENAI_API_KEY"):
+        print("Explanations skipped (OPENAI_API_KEY not set)")
+        return
+    
+    comparisons = [result["comparison"] for _, result in completed]
+    
+    print()
+    print("=" * 70)
+    explanations = None
+    if use_batch_api:
+        print(f"GENERATING {len(completed)} EXPLANATION(S) VIA BATCH API")
+        print("=" * 70)
+        try:
+            explanations = generate_explanations_batch(
+                comparisons,
+                custom_ids=[name for name, _ in completed]
+            )
+        except Exception as e:
+            # A failed, expired or cancelled job (or a failed upload) must not
+            # cost the comparisons that already finished their summary output
+            print(f"❌ Batch API failed ({e}) - falling back to concurrent requests")
+    else:
+        print(f"GENERATING {len(completed)} EXPLANATION(S) CONCURRENTLY")
+        print("=" * 70)
+    
+    if explanations is None:
+        try:
+            explanations = asyncio.run(generate_explanations_async(comparisons))
+        except Exception as e:
+            # Reported per sample below, like individual failed requests
+            explanations = [e] * len(completed)
+    
+    for (sample_name, result), explanation in zip(completed, explanations):
+        if explanation is None or isinstance(explanation, Exception):
+            print(f"❌ {sample_name}: no explanation returned ({explanation})")
+            continue
+        json_path = Path(result["output_files"]["json"])
+        summary_path = str(json_path.with_name(f"{json_path.stem}_summary.txt"))
+        save_explanation(explanation, summary_path)
+
+
+def run_all_samples(user_type: str = "org", use_batch_api: bool = False):
     """Run the pipeline on all sample pairs."""
     
     samples_dir = Path(__file__).parent / "samples"
@@ -104,6 +174,7 @@ def run_all_samples(user_type: str = "org"):
     print("=" * 70)
     print(f"Scanning: {samples_dir}")
     print(f"User Type: {user_type}")
+    print(f"Batch API: {use_batch_api}")
     print()
     
     # Find all PDF pairs
@@ -118,49 +189,72 @@ def run_all_samples(user_type: str = "org"):
         print(f"  • {name}: {Path(pdf1).name} ↔ {Path(pdf2).name}")
     print()
     
-    # Process each sample
-    results = []
+    # Process samples in parallel - each comparison is independent CPU + I/O work
+    results_by_sample = {}
+    completed_by_sample = {}  # sample_name -> pipeline_result awaiting explanation
     start_time = time.time()
+    max_workers = min(os.cpu_count() or 1, len(pairs))
     
-    for i, (sample_name, pdf1, pdf2) in enumerate(pairs, 1):
-        print()
-        print("*" * 70)
-        print(f"[{i}/{len(pairs)}] Processing: {sample_name}")
-        print("*" * 70)
-        print(f"  PDF 1: {Path(pdf1).name}")
-        print(f"  PDF 2: {Path(pdf2).name}")
-        print()
-        
-        try:
-            result = run_pipeline(
-                pdf1, 
-                pdf2, 
+    # Each comparison may split its pages over worker processes as well; share
+    # the cores between samples instead of starting cpu_count workers per sample
+    page_workers = max(1, (os.cpu_count() or 1) // max_workers)
+    
+    print(f"Running {len(pairs)} comparison(s) on {max_workers} worker process(es)...")
+    
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                run_pipeline,
+                pdf1,
+                pdf2,
                 output_name="comparison_result",
                 use_ocr=True,
-                user_type=user_type
-            )
-            
-            status = result["comparison"]["status"]
-            diff_count = result["comparison"]["total_differences"]
-            
-            results.append({
-                "sample": sample_name,
-                "status": status,
-                "differences": diff_count,
-                "success": True
-            })
-            
-            print(f"✅ {sample_name}: {status} ({diff_count} differences)")
+                user_type=user_type,
+                explain=False,
+                page_workers=page_workers
+            ): sample_name
+            for sample_name, pdf1, pdf2 in pairs
+        }
+        
+        for i, future in enumerate(as_completed(futures), 1):
+            sample_name = futures[future]
             
-        except Exception as e:
-            print(f"❌ {sample_name}: FAILED - {e}")
-            results.append({
-                "sample": sample_name,
-                "status": "ERROR",
-                "differences": 0,
-                "success": False,
-                "error": str(e)
-            })
+            try:
+                result = future.result()
+                completed_by_sample[sample_name] = result
+                
+                status = result["comparison"]["status"]
+                diff_count = result["comparison"]["total_differences"]
+                
+                results_by_sample[sample_name] = {
+                    "sample": sample_name,
+                    "status": status,
+                    "differences": diff_count,
+                    "success": True
+                }
+                
+                print(f"[{i}/{len(pairs)}] ✅ {sample_name}: {status} ({diff_count} differences)")
+                
+            except Exception as e:
+                print(f"[{i}/{len(pairs)}] ❌ {sample_name}: FAILED - {e}")
+                results_by_sample[sample_name] = {
+                    "sample": sample_name,
+                    "status": "ERROR",
+                    "differences": 0,
+                    "success": False,
+                    "error": str(e)
+                }
+    
+    # Keep the summary in the original sample order
+    results = [results_by_sample[name] for name, _, _ in pairs]
+    completed = [
+        (name, completed_by_sample[name])
+        for name, _, _ in pairs
+        if name in completed_by_sample
+    ]
+    
+    # Explanations were deferred so the requests can overlap (or be batched)
+    explain_all(completed, use_batch_api)
     
     # Print summary
     elapsed = time.time() - start_time
@@ -204,9 +298,12 @@ def run_all_samples(user_type: str = "org"):
 if __name__ == "__main__":
     # Parse arguments
     user_type = "org"
+    use_batch_api = False
     
     for i, arg in enumerate(sys.argv[1:], 1):
         if arg == "--user-type" and i < len(sys.argv) - 1:
             user_type = sys.argv[i + 1]
+        elif arg == "--batch-api":
+            use_batch_api = True
     
-    run_all_samples(user_type)
+    run_all_samples(user_type, use_batch_api)
@@ -15,10 +15,11 @@ Example:
 import sys
 import re
 import json
-import io
 import os
 import fitz
+import numpy as np
 import pdfplumber
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import List, Tuple, Dict, Optional
 from pathlib import Path
@@ -42,6 +43,22 @@ except ImportError:
     VISION_AVAILABLE = False
     print("Warning: google-cloud-vision not installed. OCR features will be disabled.")
 
+# Try to import orjson (optional, faster JSON serialization)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Pattern to match numbers: integers, decimals, negative numbers, currency
+NUMBER_PATTERN = re.compile(r'-?[\d,]+\.?\d*')
+# Cheap prefilter: text without a digit cannot contain a number
+_HAS_DIGIT = re.compile(r'\d')
+
+# Concurrent Vision requests when OCRing the embedded images of a page (the
+# requests are network-bound, so this is not tied to the CPU count)
+OCR_MAX_WORKERS = 8
+
 
 @dataclass
 class NumberMatch:
@@ -254,9 +271,6 @@ def extract_numbers_from_text(
     """
     numbers = []
     
-    # Pattern to match numbers: integers, decimals, negative numbers, currency
-    number_pattern = re.compile(r'-?[\d,]+\.?\d*')
-    
     lines = text.split('\n')
     # Use the region dimensions for relative positioning
     region_width = page_rect.width
@@ -273,7 +287,10 @@ def extract_numbers_from_text(
         relative_y = (line_idx / max(len(lines), 1)) * region_height
         line_height = region_height / max(len(lines), 1)
         
-        for match in number_pattern.finditer(line):
+        if not _HAS_DIGIT.search(line):
+            continue
+        
+        for match in NUMBER_PATTERN.finditer(line):
             num_str = match.group()
             
             # Skip if it's just a comma, period, or empty
@@ -466,11 +483,8 @@ def extract_numbers_from_page(page: fitz.Page, page_num: int) -> Tuple[List[Numb
     numbers = []
     has_selectable_text = False
     
-    # Get text blocks with position information
-    blocks = page.get_text("dict", flags=fitz.TEXT_PRESERVE_WHITESPACE)["blocks"]
-    
-    # Pattern to match numbers: integers, decimals, negative numbers, currency
-    number_pattern = re.compile(r'-?[\d,]+\.?\d*')
+    # Get text blocks with per-character positions
+    blocks = page.get_text("rawdict", flags=fitz.TEXT_PRESERVE_WHITESPACE)["blocks"]
     
     line_counter = 0
     
@@ -482,16 +496,21 @@ def extract_numbers_from_page(page: fitz.Page, page_num: int) -> Tuple[List[Numb
             line_counter += 1
             
             for span in line.get("spans", []):
-                text = span["text"]
+                chars = span["chars"]
+                text = "".join(char["c"] for char in chars)
                 
                 # Check if we have real selectable text
                 if text.strip() and "(cid:" not in text.lower():
                     has_selectable_text = True
                 
+                # Skip the number scan for spans without any digit
+                if not _HAS_DIGIT.search(text):
+                    continue
+                
                 span_rect = fitz.Rect(span["bbox"])
                 
                 # Find all numbers in this text span
-                for match in number_pattern.finditer(text):
+                for match in NUMBER_PATTERN.finditer(text):
                     num_str = match.group()
                     
                     # Skip if it's just a comma, period, or empty
@@ -505,10 +524,9 @@ def extract_numbers_from_page(page: fitz.Page, page_num: int) -> Tuple[List[Numb
                     except ValueError:
                         continue
                     
-                    # Calculate approximate position within the span
-                    char_width = span_rect.width / max(len(text), 1)
-                    start_x = span_rect.x0 + (match.start() * char_width)
-                    end_x = span_rect.x0 + (match.end() * char_width)
+                    # Exact extent from the first and last character boxes
+                    start_x = chars[match.start()]["bbox"][0]
+                    end_x = chars[match.end() - 1]["bbox"][2]
                     
                     num_rect = fitz.Rect(
                         start_x,
@@ -594,23 +612,18 @@ def extract_all_numbers(
             try:
                 plumber_page = pdfplumber_doc.pages[page_num]
                 
-                # Convert page to image for OCR
-                page_image = plumber_page.to_image(resolution=300)
-                img_bytes = io.BytesIO()
-                page_image.save(img_bytes, format="PNG")
+                # Render the page for OCR; MuPDF encodes the JPEG straight to bytes
+                pix = page.get_pixmap(dpi=300)
                 
                 # Get image dimensions for coordinate mapping
                 page_width_pts = float(plumber_page.width)
                 page_height_pts = float(plumber_page.height)
-                scale_factor = 300 / 72.0
-                img_width_px = int(page_width_pts * scale_factor)
-                img_height_px = int(page_height_pts * scale_factor)
                 
                 # Use word-level bounding boxes for accurate positioning
                 words_with_boxes = ocr_processor.ocr_image_with_boxes(
-                    img_bytes.getvalue(),
-                    img_width_px,
-                    img_height_px
+                    pix.tobytes("jpeg", jpg_quality=85),
+                    pix.width,
+                    pix.height
                 )
                 
                 if words_with_boxes:
@@ -647,6 +660,10 @@ def extract_all_numbers(
                     
                     page_bbox = (0.0, 0.0, float(plumber_page.width), float(plumber_page.height))
                     
+                    # Render every image region first (a PyMuPDF page must stay
+                    # on one thread), then send the crops to Vision concurrently:
+                    # the OCR round trips, not the rendering, dominate here
+                    crops = []
                     for img_idx, img in enumerate(plumber_page.images):
                         try:
                             raw_bbox = (img["x0"], img["top"], img["x1"], img["bottom"])
@@ -655,27 +672,23 @@ def extract_all_numbers(
                             if not safe_bbox:
                                 continue
                             
-                            # Get the cropped image with known dimensions
-                            cropped = plumber_page.crop(safe_bbox).to_image(resolution=300)
-                            img_bytes = io.BytesIO()
-                            cropped.save(img_bytes, format="PNG")
-                            
-                            # Get image dimensions for coordinate mapping
-                            # pdfplumber's to_image at 300 DPI scales the region
-                            region_width_pts = safe_bbox[2] - safe_bbox[0]
-                            region_height_pts = safe_bbox[3] - safe_bbox[1]
-                            # At 300 DPI, the image is scaled by 300/72 = 4.167x
-                            scale_factor = 300 / 72.0
-                            img_width_px = int(region_width_pts * scale_factor)
-                            img_height_px = int(region_height_pts * scale_factor)
-                            
-                            # Use the new method that returns word-level bounding boxes
-                            words_with_boxes = ocr_processor.ocr_image_with_boxes(
-                                img_bytes.getvalue(),
-                                img_width_px,
-                                img_height_px
-                            )
+                            # Render just the image region at 300 DPI; the pixmap
+                            # size gives the image dimensions for coordinate mapping
+                            pix = page.get_pixmap(dpi=300, clip=fitz.Rect(safe_bbox))
+                            crops.append((img_idx, safe_bbox, pix.tobytes("jpeg", jpg_quality=85), pix.width, pix.height))
                             
+                        except Exception as e:
+                            print(f"    ⚠️ Error processing image {img_idx + 1}: {e}")
+                    
+                    with ThreadPoolExecutor(max_workers=OCR_MAX_WORKERS) as executor:
+                        # Use the method that returns word-level bounding boxes
+                        ocr_results = list(executor.map(
+                            lambda crop: ocr_processor.ocr_image_with_boxes(*crop[2:]),
+                            crops
+                        ))
+                    
+                    for (img_idx, safe_bbox, *_), words_with_boxes in zip(crops, ocr_results):
+                        try:
                             if words_with_boxes:
                                 # Create a rect for the image region on the PDF
                                 img_rect = fitz.Rect(
@@ -741,24 +754,27 @@ def compare_numbers(
     # Compare by position - assumes identical structure
     min_len = min(len(numbers1), len(numbers2))
     
-    for i in range(min_len):
+    # Compare numeric values with tolerance in one vectorized step, then
+    # build differences only for the mismatching positions
+    values1 = np.fromiter((n.numeric_value for n in numbers1[:min_len]), dtype=np.float64, count=min_len)
+    values2 = np.fromiter((n.numeric_value for n in numbers2[:min_len]), dtype=np.float64, count=min_len)
+    
+    for i in np.nonzero(np.abs(values1 - values2) > tolerance)[0].tolist():
         n1 = numbers1[i]
         n2 = numbers2[i]
         
-        # Compare numeric values with tolerance
-        if abs(n1.numeric_value - n2.numeric_value) > tolerance:
-            # Determine source - if either used OCR, mark as OCR
-            source = "ocr" if (n1.source == "ocr" or n2.source == "ocr") else "text"
-            
-            differences.append(Difference(
-                page=n1.page,
-                line=n1.line_number,
-                old_value=n1.value,
-                new_value=n2.value,
-                old_rect=n1.rect,
-                new_rect=n2.rect,
-                source=source
-            ))
+        # Determine source - if either used OCR, mark as OCR
+        source = "ocr" if (n1.source == "ocr" or n2.source == "ocr") else "text"
+        
+        differences.append(Difference(
+            page=n1.page,
+            line=n1.line_number,
+            old_value=n1.value,
+            new_value=n2.value,
+            old_rect=n1.rect,
+            new_rect=n2.rect,
+            source=source
+        ))
     
     # Handle case where one PDF has more numbers than the other
     if len(numbers1) != len(numbers2):
@@ -859,29 +875,42 @@ def create_highlighted_pdf(
         # Draw highlights for differences on this page
         page_diffs = diffs_by_page.get(page_num, [])
         
-        for diff in page_diffs:
-            # Use different color for OCR-detected differences (orange) vs text (red)
-            color = (1, 0.5, 0) if diff.source == "ocr" else (1, 0, 0)
+        if page_diffs:
+            # Collect rectangles per color so the whole page is drawn with one
+            # Shape: one finish() per color and a single content-stream commit
+            rects_by_color: Dict[Tuple[float, float, float], List[fitz.Rect]] = {}
             
-            # Highlight in first (old) PDF
-            if diff.old_rect.is_valid and not diff.old_rect.is_empty:
-                highlight_rect1 = fitz.Rect(
-                    diff.old_rect.x0 - 2,
-                    diff.old_rect.y0 - 2,
-                    diff.old_rect.x1 + 2,
-                    diff.old_rect.y1 + 2
-                )
-                new_page.draw_rect(highlight_rect1, color=color, width=2)
+            for diff in page_diffs:
+                # Use different color for OCR-detected differences (orange) vs text (red)
+                color = (1, 0.5, 0) if diff.source == "ocr" else (1, 0, 0)
+                color_rects = rects_by_color.setdefault(color, [])
+                
+                # Highlight in first (old) PDF
+                if diff.old_rect.is_valid and not diff.old_rect.is_empty:
+                    color_rects.append(fitz.Rect(
+                        diff.old_rect.x0 - 2,
+                        diff.old_rect.y0 - 2,
+                        diff.old_rect.x1 + 2,
+                        diff.old_rect.y1 + 2
+                    ))
+                
+                # Highlight in second (new) PDF (offset to right side)
+                if diff.new_rect.is_valid and not diff.new_rect.is_empty:
+                    color_rects.append(fitz.Rect(
+                        diff.new_rect.x0 + width1 + 20 - 2,
+                        diff.new_rect.y0 - 2,
+                        diff.new_rect.x1 + width1 + 20 + 2,
+                        diff.new_rect.y1 + 2
+                    ))
             
-            # Highlight in second (new) PDF (offset to right side)
-            if diff.new_rect.is_valid and not diff.new_rect.is_empty:
-                highlight_rect2 = fitz.Rect(
-                    diff.new_rect.x0 + width1 + 20 - 2,
-                    diff.new_rect.y0 - 2,
-                    diff.new_rect.x1 + width1 + 20 + 2,
-                    diff.new_rect.y1 + 2
-                )
-                new_page.draw_rect(highlight_rect2, color=color, width=2)
+            shape = new_page.new_shape()
+            for color, color_rects in rects_by_color.items():
+                if not color_rects:
+                    continue
+                for rect in color_rects:
+                    shape.draw_rect(rect)
+                shape.finish(color=color, width=2)
+            shape.commit()
         
         # Add labels at top
         new_page.insert_text(
@@ -1028,15 +1057,19 @@ def main(
     
     # Save JSON report to the same folder as output PDF
     json_report_path = str(Path(output_path).with_suffix('.json'))
+    if ORJSON_AVAILABLE:
+        report_json = orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+    else:
+        report_json = json.dumps(report, indent=2, ensure_ascii=False)
     with open(json_report_path, 'w', encoding='utf-8') as f:
-        json.dump(report, f, indent=2, ensure_ascii=False)
+        f.write(report_json)
     print(f"JSON report saved to: {json_report_path}")
     
     # Print report
     print("=" * 60)
     print("COMPARISON REPORT")
     print("=" * 60)
-    print(json.dumps(report, indent=2))
+    print(report_json)
     print("=" * 60)
     
     return report
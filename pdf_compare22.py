@@ -6,7 +6,11 @@ Supports both selectable text PDFs and image-based PDFs (scanned/Japanese text)
 Produces both a visual highlighted PDF and a JSON summary report.
 
 Usage:
-    python pdf_compare22.py <pdf1_path> <pdf2_path> [output_pdf_path] [--user-type org|byok]
+    python pdf_compare22.py <pdf1_path> <pdf2_path> [output_pdf_path] [--user-type org|byok] [--verbose] [--no-cache]
+
+The full JSON report is written next to the output PDF; --verbose also prints it.
+Numbers extracted from each PDF are cached by file content; --no-cache re-extracts.
+Per-page progress is logged to stderr; set PDF_COMPARE_LOG=WARNING to quiet it.
 
 Example:
     python pdf_compare22.py old_report.pdf new_report.pdf highlighted_diff.pdf --user-type org
@@ -15,10 +19,18 @@ Example:
 import sys
 import re
 import json
-import io
+import logging
 import os
+import shutil
+import difflib
+import hashlib
+import pickle
+from bisect import bisect_right
+from collections import defaultdict
+from operator import attrgetter
 import fitz
-import pdfplumber
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import List, Tuple, Dict, Optional
 from pathlib import Path
@@ -33,6 +45,17 @@ if sys.platform == 'win32':
     sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, errors='replace')
     sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, errors='replace')
 
+# Per-page progress and OCR warnings go to stderr through this logger; set
+# PDF_COMPARE_LOG=WARNING (or ERROR) to quiet it on long documents
+logger = logging.getLogger("pdf_compare")
+if not logger.handlers:
+    _log_handler = logging.StreamHandler(sys.stderr)
+    _log_handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_log_handler)
+    logger.propagate = False
+    _log_level = logging.getLevelName(os.getenv("PDF_COMPARE_LOG", "INFO").upper())
+    logger.setLevel(_log_level if isinstance(_log_level, int) else logging.INFO)
+
 # Try to import Google Cloud Vision (optional dependency for OCR)
 try:
     from google.cloud import vision
@@ -42,32 +65,233 @@ except ImportError:
     VISION_AVAILABLE = False
     print("Warning: google-cloud-vision not installed. OCR features will be disabled.")
 
+# Try to import orjson (optional, faster JSON serialization)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-@dataclass
+# Documents with at least this many pages extract text in a process pool
+PARALLEL_MIN_PAGES = 4
+# Side-by-side output is composed in worker processes from this many pages on
+# (a page takes a few ms, so smaller documents don't repay the pool start-up)
+PARALLEL_MIN_HIGHLIGHT_PAGES = 100
+# Upper bound on page worker processes per document (extraction and output
+# composition); the PDF_COMPARE_PAGE_WORKERS environment variable lowers (or raises) it per run,
+# and callers can pass page_workers to set it for a single comparison
+MAX_PAGE_WORKERS = 8
+
+# Google Vision batch limits: images per batch_annotate_images call, and a cap on
+# the summed image bytes so a batch stays under the API's request size limit
+VISION_BATCH_SIZE = 16
+VISION_BATCH_MAX_BYTES = 10 * 1024 * 1024
+# Vision batch requests kept in flight at once (threads wait on network I/O)
+VISION_MAX_CONCURRENT_REQUESTS = 8
+
+# Resolution and JPEG quality used to render pages and image regions for OCR.
+# JPEG is several times smaller than PNG on the wire; OCR accuracy holds at q>=80.
+OCR_DPI = 300
+OCR_JPEG_QUALITY = 85
+
+# On-disk cache of OCR results, keyed by a hash of the image bytes
+OCR_CACHE_DIR = Path(os.getenv("PDF_COMPARE_OCR_CACHE", "~/.cache/pdf_compare_ocr")).expanduser()
+
+# Extracted numbers per PDF, keyed by a hash of the file contents, so re-running
+# a comparison on unchanged files skips text extraction and OCR entirely. The
+# key is the whole file: a page's content stream alone doesn't determine its
+# text (fonts and Form XObjects it draws live in separate objects), and OCR
+# results for changed files are still cached per image under OCR_CACHE_DIR.
+EXTRACTION_CACHE_DIR = Path(os.getenv("PDF_COMPARE_EXTRACTION_CACHE", "~/.cache/pdf_compare_extraction")).expanduser()
+# Bump when extraction output changes so stale cache entries are not reused
+_EXTRACTION_CACHE_VERSION = 1
+
+# In-process layer over the disk cache: both PDFs of a comparison (and every
+# comparison run in the same process) share it, so repeated images skip the
+# file read and JSON parse as well
+_ocr_memory_cache: Dict[str, List[Dict]] = {}
+
+# Try to import google-re2 (optional, linear-time regex engine for page scans)
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+# Numbers in page text: integers, decimals, negative numbers, thousands separators.
+# Requires at least one digit, so bare ",", "." or "-" never match. RE2's \d is
+# ASCII-only, so it spells out Unicode digits to match Python's \d.
+if RE2_AVAILABLE:
+    _NUMBER_RE = re2.compile(r'-?\p{Nd}[\p{Nd},]*(?:\.\p{Nd}+)?')
+else:
+    _NUMBER_RE = re.compile(r'-?\d[\d,]*(?:\.\d+)?')
+
+# Cheap prefilter: text without a digit cannot contain a number
+_HAS_DIGIT = re.compile(r'\d')
+
+# OCR word classification: a whole word that is a number (123, 1,234.56, -45.67)
+# or a date (2026-01-21, 01/21/2026), and the digit runs of composite words
+_PURE_NUMBER_RE = re.compile(r'^-?[\d,]+\.?\d*$')
+_DATE_RE = re.compile(r'^\d{4}[-/]\d{2}[-/]\d{2}$|^\d{2}[-/]\d{2}[-/]\d{4}$')
+_DIGITS_RE = re.compile(r'\d+')
+
+# Currency symbols dropped from OCR words, and the characters removed when
+# checking a number for all-zero OCR noise
+_CURRENCY_STRIP = str.maketrans('', '', '¥$€£')
+_ZERO_NOISE_STRIP = str.maketrans('', '', ',.0')
+
+# Text of a Vision OCR symbol, for joining a word's symbols without a Python loop
+_symbol_text = attrgetter('text')
+
+# Text extraction flags for number scanning: the rawdict defaults minus image
+# blocks (skipped anyway, but their pixel data would be copied into the dict)
+# and whitespace preservation (tabs and other spaces only need to separate words).
+# Without image blocks, the rawdict of a scanned (image-only) page costs about
+# the same as a plain get_text("text") probe, so no separate probe is needed.
+_TEXT_FLAGS = fitz.TEXTFLAGS_RAWDICT & ~fitz.TEXT_PRESERVE_IMAGES & ~fitz.TEXT_PRESERVE_WHITESPACE
+
+# CID-encoded glyph placeholders such as "(cid:123)"
+_CID_RE = re.compile(r'\(cid:', re.IGNORECASE)
+
+
+def load_json(data):
+    """Parse JSON text or bytes, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_default(obj):
+    """Convert NumPy scalars and arrays for the stdlib JSON encoder."""
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dump_json_bytes(obj, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes (NumPy values allowed), using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(
+        obj, indent=2 if indent else None, ensure_ascii=False, default=_json_default
+    ).encode("utf-8")
+
+
+def dump_json(obj, indent: bool = False) -> str:
+    """Serialize to a JSON string (UTF-8, not ASCII-escaped), using orjson when installed."""
+    return dump_json_bytes(obj, indent).decode("utf-8")
+
+
+def write_json(path, obj, indent: bool = False) -> None:
+    """Write obj to path as UTF-8 JSON, without an intermediate str."""
+    with open(path, "wb") as f:
+        f.write(dump_json_bytes(obj, indent))
+
+
+# Bounding box as plain (x0, y0, x1, y1) floats in PDF points
+BBox = Tuple[float, float, float, float]
+
+
+@dataclass(slots=True)
 class NumberMatch:
     """Represents a number found in the PDF with its location."""
     value: str
     numeric_value: float
     page: int
-    rect: fitz.Rect  # Bounding box coordinates
+    x0: float  # Bounding box coordinates
+    y0: float
+    x1: float
+    y1: float
     line_number: int  # Approximate line number on page
     source: str = "text"  # "text" or "ocr" to track extraction source
     context: str = ""  # Nearby text label describing the number
 
 
-@dataclass
+@dataclass(slots=True)
 class Difference:
     """Represents a difference found between two PDFs."""
     page: int
     line: int
     old_value: str
     new_value: str
-    old_rect: fitz.Rect
-    new_rect: fitz.Rect
+    old_rect: Optional[BBox]  # None when the number is missing from PDF1
+    new_rect: Optional[BBox]  # None when the number is missing from PDF2
     source: str = "text"  # "text" or "ocr"
     context: str = ""  # Label/field name for this value
 
 
+@dataclass
+class NumberTable:
+    """
+    Numbers extracted from a PDF, stored column-wise (one row per number).
+    
+    Parallel NumPy arrays keep tens of thousands of numbers compact and let
+    the comparison work on whole columns instead of per-number objects.
+    """
+    values: List[str]  # Original number strings
+    numeric_values: np.ndarray  # float64, parsed values
+    pages: np.ndarray  # int32, page numbers (0-indexed)
+    rects: np.ndarray  # float32, shape (N, 4): x0, y0, x1, y1
+    lines: np.ndarray  # int32, approximate line numbers on the page
+    sources: List[str]  # "text" or "ocr"
+    contexts: List[str]  # Nearby text labels
+    
+    def __len__(self) -> int:
+        return len(self.values)
+    
+    def rect(self, index: int) -> BBox:
+        """Bounding box of one number as an (x0, y0, x1, y1) tuple."""
+        return tuple(self.rects[index].tolist())
+    
+    @classmethod
+    def empty(cls) -> "NumberTable":
+        return cls(
+            values=[],
+            numeric_values=np.empty(0, dtype=np.float64),
+            pages=np.empty(0, dtype=np.int32),
+            rects=np.empty((0, 4), dtype=np.float32),
+            lines=np.empty(0, dtype=np.int32),
+            sources=[],
+            contexts=[]
+        )
+    
+    @classmethod
+    def from_matches(cls, matches: List[NumberMatch]) -> "NumberTable":
+        """Build a table from NumberMatch objects (used by the OCR path)."""
+        if not matches:
+            return cls.empty()
+        return cls(
+            values=[m.value for m in matches],
+            numeric_values=np.array([m.numeric_value for m in matches], dtype=np.float64),
+            pages=np.array([m.page for m in matches], dtype=np.int32),
+            rects=np.array([(m.x0, m.y0, m.x1, m.y1) for m in matches], dtype=np.float32).reshape(-1, 4),
+            lines=np.array([m.line_number for m in matches], dtype=np.int32),
+            sources=[m.source for m in matches],
+            contexts=[m.context for m in matches]
+        )
+    
+    @classmethod
+    def concatenate(cls, tables: List["NumberTable"]) -> "NumberTable":
+        """Join several tables (e.g. one per page) in order."""
+        tables = [t for t in tables if len(t)]
+        if not tables:
+            return cls.empty()
+        if len(tables) == 1:
+            return tables[0]
+        return cls(
+            values=[v for t in tables for v in t.values],
+            numeric_values=np.concatenate([t.numeric_values for t in tables]),
+            pages=np.concatenate([t.pages for t in tables]),
+            rects=np.concatenate([t.rects for t in tables]),
+            lines=np.concatenate([t.lines for t in tables]),
+            sources=[v for t in tables for v in t.sources],
+            contexts=[v for t in tables for v in t.contexts]
+        )
+
+
 class GoogleVisionOCRProcessor:
     """Handles OCR processing using Google Cloud Vision API."""
     
@@ -81,40 +305,37 @@ class GoogleVisionOCRProcessor:
         """
         self.client = None
         self.user_type = user_type
+        self._cache_dir = OCR_CACHE_DIR
         
         if not VISION_AVAILABLE:
-            print("⚠️ Google Cloud Vision not available. OCR will be skipped.")
+            logger.warning("⚠️ Google Cloud Vision not available. OCR will be skipped.")
             return
             
         try:
             if user_type == "org":
                 service_account_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
                 if not service_account_path:
-                    print("⚠️ GOOGLE_APPLICATION_CREDENTIALS not set in .env")
+                    logger.warning("⚠️ GOOGLE_APPLICATION_CREDENTIALS not set in .env")
                     return
                 if not os.path.exists(service_account_path):
-                    print(f"⚠️ Service account file not found: {service_account_path}")
+                    logger.warning(f"⚠️ Service account file not found: {service_account_path}")
                     return
                 credentials = service_account.Credentials.from_service_account_file(service_account_path)
                 self.client = vision.ImageAnnotatorClient(credentials=credentials)
-                print("✅ OCR initialized with organization credentials")
+                logger.info("✅ OCR initialized with organization credentials")
             elif user_type == "byok":
                 self.client = vision.ImageAnnotatorClient()
-                print("✅ OCR initialized with default credentials")
+                logger.info("✅ OCR initialized with default credentials")
             else:
-                print("❌ Invalid user type. Use 'org' or 'byok'.")
+                logger.error("❌ Invalid user type. Use 'org' or 'byok'.")
         except Exception as e:
-            print(f"⚠️ Failed to initialize Google Vision client: {e}")
+            logger.warning(f"⚠️ Failed to initialize Google Vision client: {e}")
             self.client = None
     
     def is_available(self) -> bool:
         """Check if OCR is available and properly initialized."""
         return self.client is not None
     
-    def looks_like_cid_encoded(self, text: str) -> bool:
-        """Detects (cid:XX) patterns indicating CID-encoded garbage."""
-        return "(cid:" in text.lower()
-    
     def ocr_image_bytes(self, image_bytes: bytes, language_hints: List[str] = None) -> str:
         """
         Call Google Vision OCR on image bytes.
@@ -138,14 +359,14 @@ class GoogleVisionOCRProcessor:
             response = self.client.document_text_detection(image=image, image_context=image_context)
             
             if response.error.message:
-                print(f"⚠️ Google Vision OCR error: {response.error.message}")
+                logger.warning(f"⚠️ Google Vision OCR error: {response.error.message}")
                 return ""
                 
             annotation = response.full_text_annotation
             if annotation and annotation.text:
                 return annotation.text.strip()
         except Exception as e:
-            print(f"⚠️ OCR processing error: {e}")
+            logger.warning(f"⚠️ OCR processing error: {e}")
             
         return ""
     
@@ -168,67 +389,173 @@ class GoogleVisionOCRProcessor:
         Returns:
             List of dicts with 'text' and 'bbox' (normalized 0-1 coordinates)
         """
-        if not self.client:
-            return []
+        return self.ocr_images_batch([(image_bytes, image_width, image_height)], language_hints)[0]
+    
+    def ocr_images_batch(
+        self,
+        images: List[Tuple[bytes, int, int]],
+        language_hints: List[str] = None
+    ) -> List[List[Dict]]:
+        """
+        Call Google Vision OCR on several images using batched requests.
+        
+        Images are sent up to VISION_BATCH_SIZE per batch_annotate_images call
+        (bounded by VISION_BATCH_MAX_BYTES), saving a round trip per image, and
+        up to VISION_MAX_CONCURRENT_REQUESTS batches are in flight at once.
+        Repeated images are sent once per call, and images OCR'd before (same
+        bytes and language hints) are answered from the cache without calling
+        the API.
+        
+        Args:
+            images: List of (image_bytes, image_width, image_height) tuples
+            language_hints: Language hints for OCR (default: Japanese + English)
+            
+        Returns:
+            One list of word dicts per image, in input order (empty on failure)
+        """
+        results = [[] for _ in images]
+        if not self.client or not images:
+            return results
             
         if language_hints is None:
             language_hints = ["ja", "en"]
-            
-        words_with_boxes = []
         
-        try:
-            image = vision.Image(content=image_bytes)
-            image_context = vision.ImageContext(language_hints=language_hints)
-            response = self.client.document_text_detection(image=image, image_context=image_context)
-            
-            if response.error.message:
-                print(f"⚠️ Google Vision OCR error: {response.error.message}")
-                return []
+        # Answer repeated images (re-runs, repeated logos/headers) from the cache
+        cache_keys = [self._cache_key(image_bytes, language_hints) for image_bytes, _, _ in images]
+        # Identical images within the call (a logo on every page) are sent once
+        # and their result is copied to the duplicates afterwards
+        pending = []
+        duplicates = []  # (index, index of the identical image that is sent)
+        first_index: Dict[str, int] = {}
+        for index, cache_key in enumerate(cache_keys):
+            if cache_key in first_index:
+                duplicates.append((index, first_index[cache_key]))
+                continue
+            first_index[cache_key] = index
+            cached = self._load_cached(cache_key)
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending.append(index)
+        
+        image_context = vision.ImageContext(language_hints=language_hints)
+        feature = vision.Feature(type_=vision.Feature.Type.DOCUMENT_TEXT_DETECTION)
+        
+        batches = []
+        start = 0
+        while start < len(pending):
+            # Grow the batch up to the image count and request size limits
+            end = start
+            batch_bytes = 0
+            while (end < len(pending) and end - start < VISION_BATCH_SIZE
+                   and (end == start or batch_bytes + len(images[pending[end]][0]) <= VISION_BATCH_MAX_BYTES)):
+                batch_bytes += len(images[pending[end]][0])
+                end += 1
+            batches.append(pending[start:end])
+            start = end
+        
+        def annotate(batch: List[int]) -> None:
+            requests = [
+                vision.AnnotateImageRequest(
+                    image=vision.Image(content=images[index][0]),
+                    features=[feature],
+                    image_context=image_context
+                )
+                for index in batch
+            ]
             
-            # Extract word-level bounding boxes from the response
-            for page in response.full_text_annotation.pages:
-                for block in page.blocks:
-                    for paragraph in block.paragraphs:
-                        for word in paragraph.words:
-                            # Get the word text
-                            word_text = ''.join([symbol.text for symbol in word.symbols])
-                            
-                            # Get bounding box vertices
-                            vertices = word.bounding_box.vertices
-                            if len(vertices) >= 4:
-                                # Get min/max coordinates
-                                x_coords = [v.x for v in vertices]
-                                y_coords = [v.y for v in vertices]
-                                
-                                # Normalize to 0-1 range based on image dimensions
-                                x0 = min(x_coords) / max(image_width, 1)
-                                x1 = max(x_coords) / max(image_width, 1)
-                                y0 = min(y_coords) / max(image_height, 1)
-                                y1 = max(y_coords) / max(image_height, 1)
-                                
-                                words_with_boxes.append({
-                                    'text': word_text,
-                                    'bbox': (x0, y0, x1, y1)  # Normalized coordinates
-                                })
-                                
-        except Exception as e:
-            print(f"⚠️ OCR processing error: {e}")
+            try:
+                response = self.client.batch_annotate_images(requests=requests)
+                for index, image_response in zip(batch, response.responses):
+                    if image_response.error.message:
+                        logger.warning(f"⚠️ Google Vision OCR error: {image_response.error.message}")
+                        continue
+                    _, image_width, image_height = images[index]
+                    results[index] = self._words_with_boxes(
+                        image_response.full_text_annotation, image_width, image_height
+                    )
+                    self._store_cached(cache_keys[index], results[index])
+            except Exception as e:
+                logger.warning(f"⚠️ OCR processing error: {e}")
+        
+        if len(batches) == 1:
+            annotate(batches[0])
+        elif batches:
+            # Requests are network-bound, so several batches overlap their round trips
+            with ThreadPoolExecutor(max_workers=min(VISION_MAX_CONCURRENT_REQUESTS, len(batches))) as executor:
+                list(executor.map(annotate, batches))
+        
+        for index, source_index in duplicates:
+            results[index] = results[source_index]
             
+        return results
+    
+    @staticmethod
+    def _cache_key(image_bytes: bytes, language_hints: List[str]) -> str:
+        """Cache key for an OCR request: blake2b of the image bytes and language hints."""
+        digest = hashlib.blake2b(image_bytes, digest_size=16)
+        digest.update(",".join(language_hints).encode("utf-8"))
+        return digest.hexdigest()
+    
+    def _load_cached(self, cache_key: str) -> Optional[List[Dict]]:
+        """Return cached OCR words for a key (memory first, then disk), or None."""
+        words_with_boxes = _ocr_memory_cache.get(cache_key)
+        if words_with_boxes is not None:
+            return words_with_boxes
+        
+        cache_path = self._cache_dir / f"{cache_key}.json"
+        try:
+            with open(cache_path, "rb") as f:
+                data = load_json(f.read())
+        except (OSError, ValueError):
+            return None
+        words_with_boxes = [{'text': word['text'], 'bbox': tuple(word['bbox'])} for word in data]
+        _ocr_memory_cache[cache_key] = words_with_boxes
         return words_with_boxes
     
-    def clamp_bbox_to_page(self, bbox: Tuple, page_bbox: Tuple) -> Optional[Tuple]:
-        """Ensure the bbox is safely inside the page bbox."""
-        x0, top, x1, bottom = bbox
-        page_x0, page_top, page_x1, page_bottom = page_bbox
+    def _store_cached(self, cache_key: str, words_with_boxes: List[Dict]) -> None:
+        """Write OCR words to the memory and disk caches (disk: best effort, atomic)."""
+        _ocr_memory_cache[cache_key] = words_with_boxes
+        try:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            cache_path = self._cache_dir / f"{cache_key}.json"
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            write_json(tmp_path, words_with_boxes)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write OCR cache: {e}")
+    
+    @staticmethod
+    def _words_with_boxes(annotation, image_width: int, image_height: int) -> List[Dict]:
+        """Extract words and their normalized bounding boxes from a full text annotation."""
+        word_texts = []
+        word_vertices = []
         
-        x0 = max(page_x0, min(x0, page_x1))
-        x1 = max(page_x0, min(x1, page_x1))
-        top = max(page_top, min(top, page_bottom))
-        bottom = max(page_top, min(bottom, page_bottom))
+        # Collect word texts and the first four bounding box vertices of each word
+        for page in annotation.pages:
+            for block in page.blocks:
+                for paragraph in block.paragraphs:
+                    for word in paragraph.words:
+                        vertices = word.bounding_box.vertices
+                        if len(vertices) >= 4:
+                            word_texts.append(''.join(map(_symbol_text, word.symbols)))
+                            word_vertices.append([(v.x, v.y) for v in vertices[:4]])
         
-        if x0 >= x1 or top >= bottom:
-            return None
-        return (x0, top, x1, bottom)
+        if not word_texts:
+            return []
+        
+        # Min/max over each word's vertices for all words at once: shape (N, 4, 2)
+        vertices = np.array(word_vertices, dtype=np.float64)
+        scale = np.array([max(image_width, 1), max(image_height, 1)], dtype=np.float64)
+        # Normalize to 0-1 range based on image dimensions
+        xy_min = vertices.min(axis=1) / scale
+        xy_max = vertices.max(axis=1) / scale
+        bboxes = np.column_stack((xy_min[:, 0], xy_min[:, 1], xy_max[:, 0], xy_max[:, 1])).tolist()
+        
+        return [
+            {'text': text, 'bbox': tuple(bbox)}  # Normalized coordinates
+            for text, bbox in zip(word_texts, bboxes)
+        ]
 
 
 def extract_numbers_from_text(
@@ -256,9 +583,6 @@ def extract_numbers_from_text(
     """
     numbers = []
     
-    # Pattern to match numbers: integers, decimals, negative numbers, currency
-    number_pattern = re.compile(r'-?[\d,]+\.?\d*')
-    
     lines = text.split('\n')
     # Use the region dimensions for relative positioning
     region_width = page_rect.width
@@ -268,20 +592,17 @@ def extract_numbers_from_text(
     offset_y = page_rect.y0
     
     for line_idx, line in enumerate(lines):
-        if not line.strip():
+        # Lines without a digit cannot contain a number
+        if not _HAS_DIGIT.search(line):
             continue
             
         # Estimate Y position based on line number within the region
         relative_y = (line_idx / max(len(lines), 1)) * region_height
         line_height = region_height / max(len(lines), 1)
         
-        for match in number_pattern.finditer(line):
+        for match in _NUMBER_RE.finditer(line):
             num_str = match.group()
             
-            # Skip if it's just a comma, period, or empty
-            if not num_str or num_str in [',', '.', '-']:
-                continue
-            
             # Clean and parse the number
             clean_num = num_str.replace(',', '')
             try:
@@ -295,18 +616,14 @@ def extract_numbers_from_text(
             relative_end_x = match.end() * char_width
             
             # Create bounding box with proper page offset
-            num_rect = fitz.Rect(
-                offset_x + relative_start_x,
-                offset_y + relative_y,
-                offset_x + relative_end_x,
-                offset_y + relative_y + line_height
-            )
-            
             numbers.append(NumberMatch(
                 value=num_str,
                 numeric_value=numeric_val,
                 page=page_num,
-                rect=num_rect,
+                x0=offset_x + relative_start_x,
+                y0=offset_y + relative_y,
+                x1=offset_x + relative_end_x,
+                y1=offset_y + relative_y + line_height,
                 line_number=base_line + line_idx + 1,
                 source=source
             ))
@@ -336,62 +653,55 @@ def extract_numbers_from_ocr_words(
         List of NumberMatch objects with accurate bounding boxes
     """
     numbers = []
+    if not words_with_boxes:
+        return numbers
+    
+    # Derive every per-word coordinate once, up front
+    bboxes = np.array([w['bbox'] for w in words_with_boxes], dtype=np.float64).reshape(-1, 4)
+    y_centers = (bboxes[:, 1] + bboxes[:, 3]) * 0.5
+    x_centers = (bboxes[:, 0] + bboxes[:, 2]) * 0.5
     
     # IMPORTANT: Sort words by spatial position to ensure consistent ordering
     # Sort by Y-position (top to bottom), then by X-position (left to right)
-    # Use a tolerance for Y to group words on the same line
-    def sort_key(word):
-        bbox = word['bbox']
-        y_center = (bbox[1] + bbox[3]) / 2
-        x_center = (bbox[0] + bbox[2]) / 2
-        # Round Y to group words on the same line (tolerance of 0.02 = ~2% of page height)
-        y_row = round(y_center, 2)
-        return (y_row, x_center)
-    
-    sorted_words = sorted(words_with_boxes, key=sort_key)
-    
-    # Patterns to match different types of numeric content:
+    # Round Y to group words on the same line (tolerance of 0.02 = ~2% of page height)
+    order = np.lexsort((x_centers, np.round(y_centers, 2))).tolist()
+    
+    # Numeric content is matched as (module-level patterns):
     # 1. Pure numbers with optional decimals and commas: 123, 1,234.56, -45.67
     # 2. Date-like patterns: 2026-01-21, 01/21/2026
     # 3. Reference numbers: 0142, 0001
-    number_pattern = re.compile(r'^-?[\d,]+\.?\d*$')
-    date_pattern = re.compile(r'^\d{4}[-/]\d{2}[-/]\d{2}$|^\d{2}[-/]\d{2}[-/]\d{4}$')
     
-    # Region dimensions and offset
-    region_width = region_rect.width
-    region_height = region_rect.height
-    offset_x = region_rect.x0
-    offset_y = region_rect.y0
+    # Map normalized coordinates to PDF coordinates using the region's size and offset
+    scale = np.array([region_rect.width, region_rect.height, region_rect.width, region_rect.height])
+    offset = np.array([region_rect.x0, region_rect.y0, region_rect.x0, region_rect.y0])
+    pdf_bboxes = (bboxes * scale + offset).tolist()
+    norm_bboxes = bboxes.tolist()
+    y_centers = y_centers.tolist()
+    x_centers = x_centers.tolist()
     
     line_counter = base_line
     last_y = -1
     
     # First, identify all non-numeric text with their positions (for context lookup)
     text_labels = []  # List of (y_center, x_center, x1, text)
-    for word_data in sorted_words:
-        word_text = word_data['text'].strip()
-        norm_bbox = word_data['bbox']
+    # Remove currency symbols and clean the text (once per word, reused below)
+    clean_texts = [w['text'].translate(_CURRENCY_STRIP).strip() for w in words_with_boxes]
+    for i in order:
+        word_text = words_with_boxes[i]['text'].strip()
         
         # Check if this is NOT primarily numeric
-        clean_text = word_text.replace('¥', '').replace('$', '').replace('€', '').replace('£', '').strip()
-        if clean_text and not number_pattern.match(clean_text) and not date_pattern.match(clean_text):
-            # Calculate Y center and X positions (normalized)
-            y_center = (norm_bbox[1] + norm_bbox[3]) / 2
-            x_center = (norm_bbox[0] + norm_bbox[2]) / 2
-            x1 = norm_bbox[2]  # Right edge of the text
+        clean_text = clean_texts[i]
+        if clean_text and not _PURE_NUMBER_RE.match(clean_text) and not _DATE_RE.match(clean_text):
             text_labels.append({
-                'y_center': y_center,
-                'x_center': x_center,
-                'x1': x1,
+                'y_center': y_centers[i],
+                'x_center': x_centers[i],
+                'x1': norm_bboxes[i][2],  # Right edge of the text
                 'text': word_text
             })
     
-    for word_data in sorted_words:  # Use sorted words for consistent ordering
-        word_text = word_data['text']
-        norm_bbox = word_data['bbox']  # (x0, y0, x1, y1) normalized 0-1
-        
-        # Remove currency symbols and clean the text
-        clean_text = word_text.replace('¥', '').replace('$', '').replace('€', '').replace('£', '').strip()
+    for i in order:  # Use sorted words for consistent ordering
+        norm_bbox = norm_bboxes[i]  # (x0, y0, x1, y1) normalized 0-1
+        clean_text = clean_texts[i]
         
         # Skip empty text
         if not clean_text:
@@ -403,15 +713,10 @@ def extract_numbers_from_ocr_words(
             line_counter += 1
             last_y = current_y
         
-        # Map normalized coordinates to PDF coordinates
-        pdf_x0 = offset_x + (norm_bbox[0] * region_width)
-        pdf_y0 = offset_y + (norm_bbox[1] * region_height)
-        pdf_x1 = offset_x + (norm_bbox[2] * region_width)
-        pdf_y1 = offset_y + (norm_bbox[3] * region_height)
-        num_rect = fitz.Rect(pdf_x0, pdf_y0, pdf_x1, pdf_y1)
+        pdf_x0, pdf_y0, pdf_x1, pdf_y1 = pdf_bboxes[i]
         
-        # Calculate Y center for context lookup
-        num_y_center = (norm_bbox[1] + norm_bbox[3]) / 2
+        # Y center for context lookup
+        num_y_center = y_centers[i]
         num_x0 = norm_bbox[0]
         
         # Find context: text labels on the same row to the LEFT of this position
@@ -438,10 +743,29 @@ def extract_numbers_from_ocr_words(
                 context = "..." + context[-47:]
             return context
         
+        # Fast path: plain digit runs (1234, 0142) are the most common OCR token
+        # and need no pattern matching
+        if clean_text.isdecimal():
+            # Skip all-zero patterns (likely OCR noise from Japanese/other text)
+            if clean_text.strip('0'):
+                numbers.append(NumberMatch(
+                    value=clean_text,
+                    numeric_value=float(clean_text),
+                    page=page_num,
+                    x0=pdf_x0,
+                    y0=pdf_y0,
+                    x1=pdf_x1,
+                    y1=pdf_y1,
+                    line_number=line_counter,
+                    source="ocr",
+                    context=find_context()
+                ))
+            continue
+        
         # Check if this is a date pattern (e.g., 2026-01-21)
-        if date_pattern.match(clean_text):
+        if _DATE_RE.match(clean_text):
             # For dates, store the full date for comparison
-            date_nums = re.findall(r'\d+', clean_text)
+            date_nums = _DIGITS_RE.findall(clean_text)
             if len(date_nums) == 3:
                 try:
                     numeric_val = float(''.join(date_nums))
@@ -449,7 +773,10 @@ def extract_numbers_from_ocr_words(
                         value=clean_text,
                         numeric_value=numeric_val,
                         page=page_num,
-                        rect=num_rect,
+                        x0=pdf_x0,
+                        y0=pdf_y0,
+                        x1=pdf_x1,
+                        y1=pdf_y1,
                         line_number=line_counter,
                         source="ocr",
                         context=find_context()
@@ -459,18 +786,21 @@ def extract_numbers_from_ocr_words(
             continue
         
         # Check if this is a pure number (123, 1,234.56, -45.67)
-        if number_pattern.match(clean_text):
+        if _PURE_NUMBER_RE.match(clean_text):
             try:
                 numeric_val = float(clean_text.replace(',', ''))
                 # Skip all-zero patterns (likely OCR noise from Japanese/other text)
-                if clean_text.replace(',', '').replace('.', '').replace('0', '') == '':
+                if not clean_text.translate(_ZERO_NOISE_STRIP):
                     continue
                 if clean_text not in [',', '.', '-']:
                     numbers.append(NumberMatch(
                         value=clean_text,
                         numeric_value=numeric_val,
                         page=page_num,
-                        rect=num_rect,
+                        x0=pdf_x0,
+                        y0=pdf_y0,
+                        x1=pdf_x1,
+                        y1=pdf_y1,
                         line_number=line_counter,
                         source="ocr",
                         context=find_context()
@@ -481,7 +811,7 @@ def extract_numbers_from_ocr_words(
         
         # For composite words (e.g., "INS-INV-2026-5101", "POL-EN-2026-884201")
         # Extract ALL numeric parts and create entries for significant ones
-        num_parts = re.findall(r'\d+', clean_text)
+        num_parts = _DIGITS_RE.findall(clean_text)
         for num_part in num_parts:
             # Skip very short numbers (1-2 digits) from composite words as they're likely noise
             # unless the word only has one number
@@ -494,7 +824,10 @@ def extract_numbers_from_ocr_words(
                     value=num_part,
                     numeric_value=numeric_val,
                     page=page_num,
-                    rect=num_rect,
+                    x0=pdf_x0,
+                    y0=pdf_y0,
+                    x1=pdf_x1,
+                    y1=pdf_y1,
                     line_number=line_counter,
                     source="ocr",
                     context=find_context()
@@ -505,134 +838,210 @@ def extract_numbers_from_ocr_words(
     return numbers
 
 
-def extract_numbers_from_page(page: fitz.Page, page_num: int) -> Tuple[List[NumberMatch], bool]:
+def extract_numbers_from_page(page: fitz.Page, page_num: int) -> Tuple[NumberTable, bool, bool]:
     """
     Extract all numbers from a PDF page with their positions.
     
+    Works on page.get_text("rawdict"), whose per-character bboxes give the
+    exact horizontal extent of each number instead of an estimate from the
+    average character width of the surrounding word. Numbers are returned
+    column-wise.
+    
     Args:
         page: PyMuPDF page object
         page_num: Page number (0-indexed)
     
     Returns:
-        Tuple of (List of NumberMatch objects, bool indicating if text was found)
+        Tuple of (NumberTable for the page, bool indicating if text was found,
+        bool indicating if CID-encoded "(cid:XX)" text was found)
     """
-    numbers = []
     has_selectable_text = False
+    has_cid_encoding = False
     
-    # Get text blocks with position information
-    blocks = page.get_text("dict", flags=fitz.TEXT_PRESERVE_WHITESPACE)["blocks"]
-    
-    # Pattern to match numbers: integers, decimals, negative numbers, currency
-    number_pattern = re.compile(r'-?[\d,]+\.?\d*')
-    
-    # First pass: collect ALL text spans with their positions for context lookup
-    all_text_spans = []  # List of (text, y_center, x0, x1, y0, y1)
-    
-    for block in blocks:
-        if block["type"] != 0:  # Skip non-text blocks
-            continue
-        for line in block.get("lines", []):
-            for span in line.get("spans", []):
-                text = span["text"].strip()
-                if text and "(cid:" not in text.lower():
-                    has_selectable_text = True
-                    bbox = span["bbox"]
-                    y_center = (bbox[1] + bbox[3]) / 2
-                    all_text_spans.append({
-                        "text": text,
-                        "y_center": y_center,
-                        "x0": bbox[0],
-                        "x1": bbox[2],
-                        "y0": bbox[1],
-                        "y1": bbox[3]
-                    })
-    
+    # First pass: flatten each text line into its characters and collect the
+    # span labels used for context lookup. Every line of every text block is
+    # counted, including whitespace-only ones, so line numbers are stable.
+    text_lines = []  # (line text, per-character bboxes, line number)
+    all_text_spans = []  # Labels with their positions
     line_counter = 0
-    
-    # Second pass: extract numbers and find their context
-    for block in blocks:
-        if block["type"] != 0:  # Skip non-text blocks (images, etc.)
+    for block in page.get_text("rawdict", flags=_TEXT_FLAGS)["blocks"]:
+        if block.get("type", 0) != 0:
             continue
-            
-        for line in block.get("lines", []):
+        for line in block["lines"]:
             line_counter += 1
+            chars = [char for span in line["spans"] for char in span["chars"]]
+            text_lines.append((
+                "".join(char["c"] for char in chars),
+                [char["bbox"] for char in chars],
+                line_counter
+            ))
             
-            for span in line.get("spans", []):
-                text = span["text"]
-                span_rect = fitz.Rect(span["bbox"])
-                span_y_center = (span_rect.y0 + span_rect.y1) / 2
-                
-                # Find all numbers in this text span
-                for match in number_pattern.finditer(text):
-                    num_str = match.group()
-                    
-                    # Skip if it's just a comma, period, or empty
-                    if not num_str or num_str in [',', '.', '-']:
-                        continue
-                    
-                    # Clean and parse the number
-                    clean_num = num_str.replace(',', '')
-                    try:
-                        numeric_val = float(clean_num)
-                    except ValueError:
-                        continue
-                    
-                    # Calculate approximate position within the span
-                    char_width = span_rect.width / max(len(text), 1)
-                    start_x = span_rect.x0 + (match.start() * char_width)
-                    end_x = span_rect.x0 + (match.end() * char_width)
-                    
-                    num_rect = fitz.Rect(
-                        start_x,
-                        span_rect.y0,
-                        end_x,
-                        span_rect.y1
-                    )
-                    
-                    # Find context: look for text spans on the same row (similar Y) but to the LEFT
-                    context_parts = []
-                    y_tolerance = 10  # pixels tolerance for same-row detection
-                    
-                    for ts in all_text_spans:
-                        # Same row check: Y center within tolerance
-                        if abs(ts["y_center"] - span_y_center) < y_tolerance:
-                            # Must be to the left of the number
-                            if ts["x1"] < start_x:
-                                # Skip if it's a pure number
-                                if not number_pattern.fullmatch(ts["text"]):
-                                    context_parts.append((ts["x0"], ts["text"]))
-                    
-                    # Sort by x position and take the rightmost non-number text
-                    context_parts.sort(key=lambda x: x[0], reverse=True)
-                    context = ""
-                    for _, ctx_text in context_parts[:3]:  # Take up to 3 closest labels
-                        if ctx_text not in context:
-                            context = ctx_text + " " + context if context else ctx_text
-                    
-                    # Limit context length
-                    context = context.strip()
-                    if len(context) > 50:
-                        context = "..." + context[-47:]
-                    
-                    numbers.append(NumberMatch(
-                        value=num_str,
-                        numeric_value=numeric_val,
-                        page=page_num,
-                        rect=num_rect,
-                        line_number=line_counter,
-                        source="text",
-                        context=context
-                    ))
+            # One label per span, so a label in its own span on the same line
+            # as a number (e.g. a bold "Total:" before it) stays to its left
+            for span in line["spans"]:
+                label = "".join(char["c"] for char in span["chars"]).strip()
+                if not label:
+                    continue
+                if _CID_RE.search(label):
+                    has_cid_encoding = True
+                    continue
+                has_selectable_text = True
+                # Skip pure numbers - they are values, not labels
+                if _NUMBER_RE.fullmatch(label):
+                    continue
+                bbox = span["bbox"]
+                all_text_spans.append({
+                    "text": label,
+                    "y_center": (bbox[1] + bbox[3]) / 2,
+                    "x0": bbox[0],
+                    "x1": bbox[2]
+                })
+    
+    values = []
+    numeric_values = []
+    rects = []
+    lines = []
+    contexts = []
+    
+    # Second pass: scan the text of all lines containing a digit at once. Lines
+    # are joined with "\n", which never occurs inside a number, and each match
+    # offset is mapped back to its line through the line start offsets.
+    digit_lines = [
+        line_idx for line_idx, (text, _, _) in enumerate(text_lines)
+        if _HAS_DIGIT.search(text)
+    ]
+    page_text = "\n".join(text_lines[line_idx][0] for line_idx in digit_lines)
+    line_starts = []
+    offset = 0
+    for line_idx in digit_lines:
+        line_starts.append(offset)
+        offset += len(text_lines[line_idx][0]) + 1
+    
+    for match in _NUMBER_RE.finditer(page_text):
+        num_str = match.group()
+        scan_idx = bisect_right(line_starts, match.start()) - 1
+        line_idx = digit_lines[scan_idx]
+        _, bboxes, line_counter = text_lines[line_idx]
+        start = match.start() - line_starts[scan_idx]
+        
+        # Clean and parse the number
+        clean_num = num_str.replace(',', '')
+        try:
+            numeric_val = float(clean_num)
+        except ValueError:
+            continue
+        
+        # Exact extent of the number from its first and last characters
+        char_bboxes = bboxes[start:start + len(num_str)]
+        start_x = char_bboxes[0][0]
+        end_x = char_bboxes[-1][2]
+        y0 = min(bb[1] for bb in char_bboxes)
+        y1 = max(bb[3] for bb in char_bboxes)
+        number_y_center = (y0 + y1) / 2
+        
+        # Find context: look for text on the same row (similar Y) but to the LEFT
+        context_parts = []
+        y_tolerance = 10  # pixels tolerance for same-row detection
+        
+        for ts in all_text_spans:
+            # Same row check: Y center within tolerance, left of the number
+            if abs(ts["y_center"] - number_y_center) < y_tolerance and ts["x1"] < start_x:
+                context_parts.append((ts["x0"], ts["text"]))
+        
+        # Sort by x position and take the rightmost non-number text
+        context_parts.sort(key=lambda x: x[0], reverse=True)
+        context = ""
+        for _, ctx_text in context_parts[:3]:  # Take up to 3 closest labels
+            if ctx_text not in context:
+                context = ctx_text + " " + context if context else ctx_text
+        
+        # Limit context length
+        context = context.strip()
+        if len(context) > 50:
+            context = "..." + context[-47:]
+        
+        values.append(num_str)
+        numeric_values.append(numeric_val)
+        rects.append((start_x, y0, end_x, y1))
+        lines.append(line_counter)
+        contexts.append(context)
+    
+    count = len(values)
+    numbers = NumberTable(
+        values=values,
+        numeric_values=np.array(numeric_values, dtype=np.float64),
+        pages=np.full(count, page_num, dtype=np.int32),
+        rects=np.array(rects, dtype=np.float32).reshape(count, 4),
+        lines=np.array(lines, dtype=np.int32),
+        sources=["text"] * count,
+        contexts=contexts
+    )
+    
+    return numbers, has_selectable_text, has_cid_encoding
+
+
+
+# Document opened once per page extraction worker process
+_worker_doc = None
+
+
+def _page_worker_count(page_count: int, page_workers: Optional[int] = None) -> int:
+    """
+    Number of page extraction processes to use for a document (1 = in-process).
     
-    return numbers, has_selectable_text
+    page_workers caps the count for this call; without it the cap comes from
+    PDF_COMPARE_PAGE_WORKERS or MAX_PAGE_WORKERS.
+    """
+    if page_workers is not None:
+        limit = page_workers
+    else:
+        try:
+            limit = int(os.getenv("PDF_COMPARE_PAGE_WORKERS", MAX_PAGE_WORKERS))
+        except ValueError:
+            limit = MAX_PAGE_WORKERS
+    if page_count < PARALLEL_MIN_PAGES:
+        return 1
+    return max(1, min(os.cpu_count() or 1, limit, page_count))
+
 
+def _init_page_worker(pdf_path: str) -> None:
+    """Process pool initializer: open the PDF once for all pages this worker handles."""
+    global _worker_doc
+    _worker_doc = fitz.open(pdf_path)
+
+
+def _extract_page_worker(page_num: int) -> Tuple[NumberTable, bool, bool]:
+    """Process pool worker: extract numbers from one page of the worker's PDF."""
+    return extract_numbers_from_page(_worker_doc[page_num], page_num)
+
+
+@dataclass(slots=True)
+class _OCRJob:
+    """A page or embedded image region queued for OCR."""
+    page_num: int
+    region: fitz.Rect  # Region on the PDF page, in points
+    image_index: Optional[int] = None  # None for full-page OCR
+
+
+def _render_for_ocr(page: fitz.Page, job: _OCRJob) -> Tuple[bytes, int, int]:
+    """
+    Render an OCR job's region at OCR_DPI with PyMuPDF's native rasterizer.
+    
+    Returns:
+        Tuple of (JPEG bytes, image width in pixels, image height in pixels)
+    """
+    clip = None if job.image_index is None else job.region
+    pix = page.get_pixmap(dpi=OCR_DPI, clip=clip)
+    return pix.tobytes("jpeg", jpg_quality=OCR_JPEG_QUALITY), pix.width, pix.height
 
 
 def extract_all_numbers(
     pdf_path: str, 
     use_ocr: bool = True, 
-    user_type: str = "org"
-) -> Tuple[List[NumberMatch], int]:
+    user_type: str = "org",
+    ocr_processor: Optional[GoogleVisionOCRProcessor] = None,
+    page_workers: Optional[int] = None
+) -> Tuple[NumberTable, int]:
     """
     Extract all numbers from a PDF document, using OCR for non-selectable text.
     
@@ -640,196 +1049,248 @@ def extract_all_numbers(
         pdf_path: Path to the PDF file
         use_ocr: Whether to use OCR for non-selectable pages
         user_type: "org" or "byok" for credential handling
+        ocr_processor: OCR processor to reuse (created from user_type if None)
+        page_workers: Cap on page worker processes (None: environment/default)
     
     Returns:
-        Tuple of (List of all NumberMatch objects, count of pages using OCR)
+        Tuple of (NumberTable with all numbers, count of pages using OCR)
     """
-    all_numbers = []
-    ocr_pages_count = 0
-    
     # Initialize OCR processor if needed
-    ocr_processor = None
-    if use_ocr:
+    if not use_ocr:
+        ocr_processor = None
+    elif ocr_processor is None:
         ocr_processor = GoogleVisionOCRProcessor(user_type)
     
     doc = fitz.open(pdf_path)
     
-    # Also open with pdfplumber for image extraction (needed for OCR)
-    pdfplumber_doc = None
-    if use_ocr and ocr_processor and ocr_processor.is_available():
-        try:
-            pdfplumber_doc = pdfplumber.open(pdf_path)
-        except Exception as e:
-            print(f"⚠️ Could not open PDF with pdfplumber: {e}")
-    
-    for page_num in range(len(doc)):
+    # Extract numbers from selectable text first; pages are independent, so
+    # larger documents are spread over worker processes
+    page_count = len(doc)
+    max_workers = _page_worker_count(page_count, page_workers)
+    if max_workers > 1:
+        # A few chunks per worker balances load while batching the IPC round trips
+        chunksize = max(1, page_count // (max_workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_page_worker,
+            initargs=(pdf_path,)
+        ) as executor:
+            text_results = list(executor.map(
+                _extract_page_worker,
+                range(page_count),
+                chunksize=chunksize
+            ))
+    else:
+        text_results = [
+            extract_numbers_from_page(doc[page_num], page_num)
+            for page_num in range(page_count)
+        ]
+    
+    ocr_ready = bool(ocr_processor and ocr_processor.is_available())
+    
+    # Pass 1: decide per page what needs OCR (full page or embedded images)
+    page_tables = []
+    ocr_jobs: List[_OCRJob] = []
+    for page_num in range(page_count):
         page = doc[page_num]
-        print(f"\n📄 Processing Page {page_num + 1}/{len(doc)}")
+        logger.info(f"📄 Processing Page {page_num + 1}/{page_count}")
         
-        # Try to extract numbers from selectable text first
-        numbers, has_selectable_text = extract_numbers_from_page(page, page_num)
+        numbers, has_selectable_text, has_cid_encoding = text_results[page_num]
+        page_tables.append(numbers)
         
         # Check if we need OCR
         needs_ocr = False
-        ocr_applied = False
         
         if not has_selectable_text:
             # No selectable text found - need full page OCR
             needs_ocr = True
-            print(f"  ⚠️ No selectable text found on page {page_num + 1}")
+            logger.warning(f"  ⚠️ No selectable text found on page {page_num + 1}")
         elif len(numbers) == 0:
             # Has text but no numbers - might be CID-encoded or images
-            raw_text = page.get_text()
-            if ocr_processor and ocr_processor.looks_like_cid_encoded(raw_text):
+            if ocr_processor and has_cid_encoding:
                 needs_ocr = True
-                print(f"  ⚠️ CID-encoded text detected on page {page_num + 1}")
+                logger.warning(f"  ⚠️ CID-encoded text detected on page {page_num + 1}")
         else:
-            print(f"  ✅ Found {len(numbers)} numbers from selectable text")
+            logger.info(f"  ✅ Found {len(numbers)} numbers from selectable text")
         
-        # Perform OCR if needed and available
-        if needs_ocr and ocr_processor and ocr_processor.is_available() and pdfplumber_doc:
-            print(f"  🔍 Performing full-page OCR on page {page_num + 1}...")
-            
-            try:
-                plumber_page = pdfplumber_doc.pages[page_num]
-                
-                # Convert page to image for OCR
-                page_image = plumber_page.to_image(resolution=300)
-                img_bytes = io.BytesIO()
-                page_image.save(img_bytes, format="PNG")
-                
-                # Get image dimensions for coordinate mapping
-                page_width_pts = float(plumber_page.width)
-                page_height_pts = float(plumber_page.height)
-                scale_factor = 300 / 72.0
-                img_width_px = int(page_width_pts * scale_factor)
-                img_height_px = int(page_height_pts * scale_factor)
-                
-                # Use word-level bounding boxes for accurate positioning
-                words_with_boxes = ocr_processor.ocr_image_with_boxes(
-                    img_bytes.getvalue(),
-                    img_width_px,
-                    img_height_px
-                )
-                
-                if words_with_boxes:
-                    print(f"  ✅ OCR extracted {len(words_with_boxes)} words")
-                    
-                    # Create page rect for coordinate mapping
-                    page_rect = fitz.Rect(0, 0, page_width_pts, page_height_pts)
-                    
-                    # Extract numbers with accurate bounding boxes
-                    ocr_numbers = extract_numbers_from_ocr_words(
-                        words_with_boxes,
-                        page_num,
-                        page_rect,
-                        base_line=0
-                    )
-                    
-                    if ocr_numbers:
-                        print(f"  ✅ Found {len(ocr_numbers)} numbers from OCR")
-                        # Replace any existing numbers with OCR results for this page
-                        numbers = ocr_numbers
-                        ocr_applied = True
-                else:
-                    print(f"  ⚠️ OCR returned no words")
-                    
-            except Exception as e:
-                print(f"  ⚠️ OCR failed on page {page_num + 1}: {e}")
+        # Queue OCR if needed and available
+        if needs_ocr and ocr_ready:
+            logger.info(f"  🔍 Queued full-page OCR for page {page_num + 1}")
+            ocr_jobs.append(_OCRJob(page_num=page_num, region=fitz.Rect(page.rect)))
         
         # Also check for embedded images that might contain numbers
-        elif has_selectable_text and pdfplumber_doc and ocr_processor and ocr_processor.is_available():
+        elif has_selectable_text and ocr_ready:
             try:
-                plumber_page = pdfplumber_doc.pages[page_num]
-                if plumber_page.images:
-                    print(f"  🔍 Found {len(plumber_page.images)} embedded image(s), checking for numbers...")
-                    
-                    page_bbox = (0.0, 0.0, float(plumber_page.width), float(plumber_page.height))
+                # Placements of all images on the page (including inline images)
+                image_infos = page.get_image_info()
+                if image_infos:
+                    logger.info(f"  🔍 Found {len(image_infos)} embedded image(s), queued for OCR")
                     
-                    for img_idx, img in enumerate(plumber_page.images):
-                        try:
-                            raw_bbox = (img["x0"], img["top"], img["x1"], img["bottom"])
-                            safe_bbox = ocr_processor.clamp_bbox_to_page(raw_bbox, page_bbox)
-                            
-                            if not safe_bbox:
-                                continue
-                            
-                            # Get the cropped image with known dimensions
-                            cropped = plumber_page.crop(safe_bbox).to_image(resolution=300)
-                            img_bytes = io.BytesIO()
-                            cropped.save(img_bytes, format="PNG")
-                            
-                            # Get image dimensions for coordinate mapping
-                            # pdfplumber's to_image at 300 DPI scales the region
-                            region_width_pts = safe_bbox[2] - safe_bbox[0]
-                            region_height_pts = safe_bbox[3] - safe_bbox[1]
-                            # At 300 DPI, the image is scaled by 300/72 = 4.167x
-                            scale_factor = 300 / 72.0
-                            img_width_px = int(region_width_pts * scale_factor)
-                            img_height_px = int(region_height_pts * scale_factor)
-                            
-                            # Use the new method that returns word-level bounding boxes
-                            words_with_boxes = ocr_processor.ocr_image_with_boxes(
-                                img_bytes.getvalue(),
-                                img_width_px,
-                                img_height_px
-                            )
-                            
-                            if words_with_boxes:
-                                # Create a rect for the image region on the PDF
-                                img_rect = fitz.Rect(
-                                    safe_bbox[0], safe_bbox[1], 
-                                    safe_bbox[2], safe_bbox[3]
-                                )
-                                
-                                # Extract numbers using accurate bounding boxes
-                                img_numbers = extract_numbers_from_ocr_words(
-                                    words_with_boxes,
-                                    page_num,
-                                    img_rect,
-                                    base_line=len(numbers)
-                                )
-                                
-                                if img_numbers:
-                                    print(f"    ✅ Found {len(img_numbers)} numbers in image {img_idx + 1}")
-                                    numbers.extend(img_numbers)
-                                    ocr_applied = True
-                                    
-                        except Exception as e:
-                            print(f"    ⚠️ Error processing image {img_idx + 1}: {e}")
+                    for img_idx, img in enumerate(image_infos):
+                        # Keep only the part of the image that is on the page
+                        region = fitz.Rect(img["bbox"]) & page.rect
+                        
+                        if not region.is_empty:
+                            ocr_jobs.append(_OCRJob(
+                                page_num=page_num,
+                                region=region,
+                                image_index=img_idx
+                            ))
                             
             except Exception as e:
-                print(f"  ⚠️ Error checking embedded images: {e}")
+                logger.warning(f"  ⚠️ Error checking embedded images: {e}")
+    
+    # Pass 2: OCR all queued regions with batched Vision requests. Images are
+    # rendered one round of concurrent batches at a time so a long scanned
+    # document is never held in memory all at once.
+    ocr_words: List[List[Dict]] = [[] for _ in ocr_jobs]
+    if ocr_jobs:
+        logger.info(f"🔍 Running OCR on {len(ocr_jobs)} region(s) in batches of up to {VISION_BATCH_SIZE}...")
+    round_size = VISION_BATCH_SIZE * VISION_MAX_CONCURRENT_REQUESTS
+    for start in range(0, len(ocr_jobs), round_size):
+        batch_indices = []
+        images = []
+        for job_idx in range(start, min(start + round_size, len(ocr_jobs))):
+            job = ocr_jobs[job_idx]
+            try:
+                images.append(_render_for_ocr(doc[job.page_num], job))
+                batch_indices.append(job_idx)
+            except Exception as e:
+                logger.warning(f"  ⚠️ Could not render page {job.page_num + 1} for OCR: {e}")
         
-        if ocr_applied:
-            ocr_pages_count += 1
+        for job_idx, words_with_boxes in zip(batch_indices, ocr_processor.ocr_images_batch(images)):
+            ocr_words[job_idx] = words_with_boxes
+    
+    # Pass 3: turn OCR words into numbers, in page and image order
+    ocr_applied_pages = set()
+    for job, words_with_boxes in zip(ocr_jobs, ocr_words):
+        page_num = job.page_num
+        numbers = page_tables[page_num]
         
-        all_numbers.extend(numbers)
+        try:
+            if job.image_index is None:
+                # Full-page OCR
+                if not words_with_boxes:
+                    logger.warning(f"  ⚠️ Page {page_num + 1}: OCR returned no words")
+                    continue
+                logger.info(f"  ✅ Page {page_num + 1}: OCR extracted {len(words_with_boxes)} words")
+                
+                # Extract numbers with accurate bounding boxes
+                ocr_numbers = extract_numbers_from_ocr_words(
+                    words_with_boxes,
+                    page_num,
+                    job.region,
+                    base_line=0
+                )
+                
+                if ocr_numbers:
+                    logger.info(f"  ✅ Page {page_num + 1}: Found {len(ocr_numbers)} numbers from OCR")
+                    # Replace any existing numbers with OCR results for this page
+                    page_tables[page_num] = NumberTable.from_matches(ocr_numbers)
+                    ocr_applied_pages.add(page_num)
+            elif words_with_boxes:
+                # Embedded image: extract numbers using accurate bounding boxes
+                img_numbers = extract_numbers_from_ocr_words(
+                    words_with_boxes,
+                    page_num,
+                    job.region,
+                    base_line=len(numbers)
+                )
+                
+                if img_numbers:
+                    logger.info(f"    ✅ Page {page_num + 1}: Found {len(img_numbers)} numbers in image {job.image_index + 1}")
+                    page_tables[page_num] = NumberTable.concatenate([
+                        numbers, NumberTable.from_matches(img_numbers)
+                    ])
+                    ocr_applied_pages.add(page_num)
+                    
+        except Exception as e:
+            logger.warning(f"  ⚠️ OCR failed on page {page_num + 1}: {e}")
+    
+    ocr_pages_count = len(ocr_applied_pages)
     
     total_pages = len(doc)
     doc.close()
-    if pdfplumber_doc:
-        pdfplumber_doc.close()
     
-    print(f"\n📊 OCR was applied on {ocr_pages_count} out of {total_pages} pages")
+    logger.info(f"📊 OCR was applied on {ocr_pages_count} out of {total_pages} pages")
+    
+    return NumberTable.concatenate(page_tables), ocr_pages_count
+
+
+def _file_sha256(path: str) -> str:
+    """SHA-256 of a file's contents, read in 1 MiB chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _files_identical(path1: str, path2: str) -> bool:
+    """True if both files have the same bytes (sizes compared before hashing)."""
+    if os.path.getsize(path1) != os.path.getsize(path2):
+        return False
+    return _file_sha256(path1) == _file_sha256(path2)
+
+
+def extract_all_numbers_cached(
+    pdf_path: str,
+    use_ocr: bool = True,
+    user_type: str = "org",
+    ocr_processor: Optional[GoogleVisionOCRProcessor] = None,
+    page_workers: Optional[int] = None
+) -> Tuple[NumberTable, int]:
+    """
+    extract_all_numbers() memoized on disk by PDF content.
+    
+    Results are stored in EXTRACTION_CACHE_DIR under the file's SHA-256 and
+    whether OCR was usable, so a document is re-extracted when its bytes
+    change or OCR becomes available.
+    """
+    if use_ocr and ocr_processor is None:
+        ocr_processor = GoogleVisionOCRProcessor(user_type)
+    ocr_ready = bool(use_ocr and ocr_processor and ocr_processor.is_available())
+    
+    cache_key = f"{_file_sha256(pdf_path)}-v{_EXTRACTION_CACHE_VERSION}-{'ocr' if ocr_ready else 'text'}"
+    cache_path = EXTRACTION_CACHE_DIR / f"{cache_key}.pkl"
+    try:
+        with open(cache_path, "rb") as f:
+            numbers, ocr_pages = pickle.load(f)
+        logger.info(f"♻️ Reusing extracted numbers for unchanged file {Path(pdf_path).name}")
+        return numbers, ocr_pages
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+        pass
     
-    return all_numbers, ocr_pages_count
+    numbers, ocr_pages = extract_all_numbers(pdf_path, use_ocr, user_type, ocr_processor, page_workers)
+    
+    try:
+        EXTRACTION_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump((numbers, ocr_pages), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not write extraction cache: {e}")
+    
+    return numbers, ocr_pages
 
 
 def compare_numbers(
-    numbers1: List[NumberMatch], 
-    numbers2: List[NumberMatch],
+    numbers1: NumberTable, 
+    numbers2: NumberTable,
     tolerance: float = 0.0001,
     y_tolerance: float = 15.0,  # Pixels for row matching
     x_tolerance: float = 50.0   # Pixels for column matching
 ) -> List[Difference]:
     """
-    Compare two lists of numbers and find differences using row-based semantic matching.
+    Compare two tables of numbers and find differences using row-based semantic matching.
     
     Instead of simple positional comparison, this uses:
     1. Y-position grouping (numbers on the same row)
     2. X-position matching within rows
-    3. Value-based fallback matching
+    3. Value-based fallback matching: numbers with no spatial partner on a
+       page are aligned by value in reading order (difflib), so numbers that
+       only moved are not reported as missing
     
     Args:
         numbers1: Numbers from first PDF (old/baseline)
@@ -843,92 +1304,114 @@ def compare_numbers(
     """
     differences = []
     
-    # Group numbers by page
-    def group_by_page(numbers):
-        pages = {}
-        for n in numbers:
-            if n.page not in pages:
-                pages[n.page] = []
-            pages[n.page].append(n)
-        return pages
-    
-    pages1 = group_by_page(numbers1)
-    pages2 = group_by_page(numbers2)
-    
-    all_pages = set(pages1.keys()) | set(pages2.keys())
+    all_pages = set(numbers1.pages.tolist()) | set(numbers2.pages.tolist())
     
     for page_num in sorted(all_pages):
-        page_nums1 = pages1.get(page_num, [])
-        page_nums2 = pages2.get(page_num, [])
+        # Row indices of this page's numbers in each table
+        page_idx1 = np.nonzero(numbers1.pages == page_num)[0]
+        page_idx2 = np.nonzero(numbers2.pages == page_num)[0]
         
-        # Create a working copy of page2 numbers (to track matched)
-        unmatched2 = list(page_nums2)
-        matched1 = set()
+        # Positions of this page's PDF2 numbers, and which are already matched
+        x2 = numbers2.rects[page_idx2, 0]
+        y2 = numbers2.rects[page_idx2, 1]
+        matched2 = np.zeros(len(page_idx2), dtype=bool)
         
-        # Try to match each number from PDF1 with a number from PDF2
-        for n1 in page_nums1:
-            best_match = None
-            best_score = float('inf')
-            
-            for n2 in unmatched2:
-                # Calculate matching score based on position
-                y_diff = abs(n1.rect.y0 - n2.rect.y0)
-                x_diff = abs(n1.rect.x0 - n2.rect.x0)
+        # Spatial pass: match each number from PDF1 with a number from PDF2.
+        # PDF1 positions are read from the rect column once per page.
+        spatial_matches: Dict[int, int] = {}
+        page_x1 = numbers1.rects[page_idx1, 0].tolist()
+        page_y1 = numbers1.rects[page_idx1, 1].tolist()
+        for i, x1, y1 in zip(page_idx1.tolist(), page_x1, page_y1):
+            if len(page_idx2):
+                # Score every candidate at once: same row, same column area,
+                # not yet matched; prefer the closest (first one on ties)
+                y_diff = np.abs(y2 - y1)
+                x_diff = np.abs(x2 - x1)
+                scores = y_diff + x_diff
+                scores[(y_diff > y_tolerance) | (x_diff > x_tolerance) | matched2] = np.inf
                 
-                # Check if on same row
-                if y_diff <= y_tolerance:
-                    # Check if in same column area
-                    if x_diff <= x_tolerance:
-                        # Score: prefer closer matches
-                        score = y_diff + x_diff
-                        if score < best_score:
-                            best_score = score
-                            best_match = n2
+                k = int(np.argmin(scores))
+                if np.isfinite(scores[k]):
+                    matched2[k] = True
+                    spatial_matches[i] = int(page_idx2[k])
+        
+        partners2 = {j: i for i, j in spatial_matches.items()}
+        
+        # Compare the values of all spatial pairs in one vectorized step
+        pairs1 = np.fromiter(spatial_matches.keys(), dtype=np.intp, count=len(spatial_matches))
+        pairs2 = np.fromiter(spatial_matches.values(), dtype=np.intp, count=len(spatial_matches))
+        pair_differs = np.abs(numbers1.numeric_values[pairs1] - numbers2.numeric_values[pairs2]) > tolerance
+        changed1 = set(pairs1[pair_differs].tolist())
+        
+        # Value-based fallback: numbers with no spatial partner are aligned by
+        # value in reading order. Equal runs are the same numbers at shifted
+        # positions (e.g. after an inserted row). Spatial pairs are never
+        # re-matched here, so a changed value stays reported against its partner
+        # instead of being matched to an unrelated equal value elsewhere
+        open1 = [i for i in page_idx1.tolist() if i not in spatial_matches]
+        open2 = [j for j in page_idx2.tolist() if j not in partners2]
+        value_matched1 = set()
+        value_matched2 = set()
+        if open1 and open2:
+            matcher = difflib.SequenceMatcher(
+                None,
+                [numbers1.values[i] for i in open1],
+                [numbers2.values[j] for j in open2],
+                autojunk=False
+            )
+            for a, b, size in matcher.get_matching_blocks():
+                value_matched1.update(open1[a:a + size])
+                value_matched2.update(open2[b:b + size])
+        
+        # Differences are built positionally (page, line, old/new value,
+        # old/new rect, source, context); orphans can number in the thousands
+        for i in page_idx1.tolist():
+            if i in value_matched1:
+                continue
             
-            if best_match:
+            j = spatial_matches.get(i)
+            if j is not None:
                 # Found a match - check if values differ
-                if abs(n1.numeric_value - best_match.numeric_value) > tolerance:
-                    source = "ocr" if (n1.source == "ocr" or best_match.source == "ocr") else "text"
-                    context = n1.context if n1.context else best_match.context
+                if i in changed1:
+                    source = "ocr" if (numbers1.sources[i] == "ocr" or numbers2.sources[j] == "ocr") else "text"
+                    context = numbers1.contexts[i] if numbers1.contexts[i] else numbers2.contexts[j]
                     
                     differences.append(Difference(
-                        page=n1.page,
-                        line=n1.line_number,
-                        old_value=n1.value,
-                        new_value=best_match.value,
-                        old_rect=n1.rect,
-                        new_rect=best_match.rect,
-                        source=source,
-                        context=context
+                        page_num,
+                        int(numbers1.lines[i]),
+                        numbers1.values[i],
+                        numbers2.values[j],
+                        numbers1.rect(i),
+                        numbers2.rect(j),
+                        source,
+                        context
                     ))
-                
-                # Mark as matched
-                unmatched2.remove(best_match)
-                matched1.add(id(n1))
             else:
                 # No match found - this number is only in PDF1
                 differences.append(Difference(
-                    page=n1.page,
-                    line=n1.line_number,
-                    old_value=n1.value,
-                    new_value="<missing>",
-                    old_rect=n1.rect,
-                    new_rect=fitz.Rect(),
-                    source=n1.source,
-                    context=n1.context
+                    page_num,
+                    int(numbers1.lines[i]),
+                    numbers1.values[i],
+                    "<missing>",
+                    numbers1.rect(i),
+                    None,
+                    numbers1.sources[i],
+                    numbers1.contexts[i]
                 ))
         
         # Report remaining unmatched numbers from PDF2
-        for n2 in unmatched2:
+        for j in page_idx2.tolist():
+            if j in value_matched2 or j in partners2:
+                continue  # Value-matched, or reported (or equal) as a pair above
             differences.append(Difference(
-                page=n2.page,
-                line=n2.line_number,
-                old_value="<missing>",
-                new_value=n2.value,
-                old_rect=fitz.Rect(),
-                new_rect=n2.rect,
-                source=n2.source,
-                context=n2.context
+                page_num,
+                int(numbers2.lines[j]),
+                "<missing>",
+                numbers2.values[j],
+                None,
+                numbers2.rect(j),
+                numbers2.sources[j],
+                numbers2.contexts[j]
             ))
     
     # Sort differences by page, then by line
@@ -938,53 +1421,35 @@ def compare_numbers(
 
 
 
-def create_highlighted_pdf(
-    pdf1_path: str,
-    pdf2_path: str,
-    differences: List[Difference],
-    output_path: str
+def _compose_pages(
+    output_doc: fitz.Document,
+    doc1: fitz.Document,
+    doc2: fitz.Document,
+    page_nums: range,
+    diffs_by_page: Dict[int, List[Difference]]
 ) -> None:
-    """
-    Create a side-by-side comparison PDF with differences highlighted.
-    
-    Args:
-        pdf1_path: Path to first (old) PDF
-        pdf2_path: Path to second (new) PDF
-        differences: List of differences found
-        output_path: Path for output highlighted PDF
-    """
-    doc1 = fitz.open(pdf1_path)
-    doc2 = fitz.open(pdf2_path)
-    
-    # Create output document
-    output_doc = fitz.open()
-    
-    # Get maximum page count
-    max_pages = max(len(doc1), len(doc2))
-    
-    # Group differences by page for efficient highlighting
-    diffs_by_page: Dict[int, List[Difference]] = {}
-    for diff in differences:
-        if diff.page not in diffs_by_page:
-            diffs_by_page[diff.page] = []
-        diffs_by_page[diff.page].append(diff)
+    """Append side-by-side pages with highlighted differences to output_doc."""
+    page_count1, page_count2 = len(doc1), len(doc2)
     
-    for page_num in range(max_pages):
+    for page_num in page_nums:
         # Get pages (or create blank if one PDF is shorter)
-        page1 = doc1[page_num] if page_num < len(doc1) else None
-        page2 = doc2[page_num] if page_num < len(doc2) else None
+        page1 = doc1[page_num] if page_num < page_count1 else None
+        page2 = doc2[page_num] if page_num < page_count2 else None
         
-        # Calculate dimensions for side-by-side layout
-        width1 = page1.rect.width if page1 else 612
-        height1 = page1.rect.height if page1 else 792
-        width2 = page2.rect.width if page2 else 612
-        height2 = page2.rect.height if page2 else 792
+        # Calculate dimensions for side-by-side layout (US Letter for a missing page)
+        width1, height1 = (page1.rect.width, page1.rect.height) if page1 else (612, 792)
+        width2, height2 = (page2.rect.width, page2.rect.height) if page2 else (612, 792)
         
         # Create new page that fits both pages side by side
         new_width = width1 + width2 + 20  # 20px gap between pages
         new_height = max(height1, height2)
         new_page = output_doc.new_page(width=new_width, height=new_height)
         
+        # Pages without differences are composed the same way: copying them
+        # with insert_pdf() would put OLD and NEW on separate output pages and
+        # break the one-output-page-per-input-page numbering the report uses.
+        # show_pdf_page() keeps a graft map per source document, so shared
+        # resources are only copied once per document anyway.
         # Insert first page on the left
         if page1:
             new_page.show_pdf_page(
@@ -1004,29 +1469,39 @@ def create_highlighted_pdf(
         # Draw highlights for differences on this page
         page_diffs = diffs_by_page.get(page_num, [])
         
-        for diff in page_diffs:
-            # Use different color for OCR-detected differences (orange) vs text (red)
-            color = (1, 0.5, 0) if diff.source == "ocr" else (1, 0, 0)
+        if page_diffs:
+            # Collect rectangles per color so the whole page is drawn with one
+            # Shape: one finish() per color and a single content-stream commit
+            # Padded rects are plain tuples: draw_rect() converts its argument
+            # to a fitz.Rect anyway, so building one here would be a second copy
+            rects_by_color: Dict[Tuple[float, float, float], List[BBox]] = {}
+            x_shift = width1 + 20
             
-            # Highlight in first (old) PDF
-            if diff.old_rect.is_valid and not diff.old_rect.is_empty:
-                highlight_rect1 = fitz.Rect(
-                    diff.old_rect.x0 - 2,
-                    diff.old_rect.y0 - 2,
-                    diff.old_rect.x1 + 2,
-                    diff.old_rect.y1 + 2
-                )
-                new_page.draw_rect(highlight_rect1, color=color, width=2)
+            for diff in page_diffs:
+                # Use different color for OCR-detected differences (orange) vs text (red)
+                color = (1, 0.5, 0) if diff.source == "ocr" else (1, 0, 0)
+                color_rects = rects_by_color.setdefault(color, [])
+                
+                # Highlight in first (old) PDF
+                if diff.old_rect is not None:
+                    x0, y0, x1, y1 = diff.old_rect
+                    if x0 < x1 and y0 < y1:
+                        color_rects.append((x0 - 2, y0 - 2, x1 + 2, y1 + 2))
+                
+                # Highlight in second (new) PDF (offset to right side)
+                if diff.new_rect is not None:
+                    x0, y0, x1, y1 = diff.new_rect
+                    if x0 < x1 and y0 < y1:
+                        color_rects.append((x0 + x_shift - 2, y0 - 2, x1 + x_shift + 2, y1 + 2))
             
-            # Highlight in second (new) PDF (offset to right side)
-            if diff.new_rect.is_valid and not diff.new_rect.is_empty:
-                highlight_rect2 = fitz.Rect(
-                    diff.new_rect.x0 + width1 + 20 - 2,
-                    diff.new_rect.y0 - 2,
-                    diff.new_rect.x1 + width1 + 20 + 2,
-                    diff.new_rect.y1 + 2
-                )
-                new_page.draw_rect(highlight_rect2, color=color, width=2)
+            shape = new_page.new_shape()
+            for color, color_rects in rects_by_color.items():
+                if not color_rects:
+                    continue
+                for rect in color_rects:
+                    shape.draw_rect(rect)
+                shape.finish(color=color, width=2)
+            shape.commit()
         
         # Add labels at top
         new_page.insert_text(
@@ -1043,21 +1518,112 @@ def create_highlighted_pdf(
             fontname="helv",
             color=(0, 0, 0.8)
         )
+
+
+def _compose_pages_worker(
+    pdf1_path: str,
+    pdf2_path: str,
+    page_nums: range,
+    diffs_by_page: Dict[int, List[Difference]]
+) -> bytes:
+    """Process pool worker: compose a range of output pages as a standalone PDF."""
+    doc1 = fitz.open(pdf1_path)
+    doc2 = fitz.open(pdf2_path)
+    part_doc = fitz.open()
+    _compose_pages(part_doc, doc1, doc2, page_nums, diffs_by_page)
+    part_bytes = part_doc.tobytes()
+    part_doc.close()
+    doc1.close()
+    doc2.close()
+    return part_bytes
+
+
+def create_highlighted_pdf(
+    pdf1_path: str,
+    pdf2_path: str,
+    differences: List[Difference],
+    output_path: str,
+    page_workers: Optional[int] = None
+) -> bool:
+    """
+    Create a side-by-side comparison PDF with differences highlighted.
+    
+    When there are no differences nothing would be highlighted, so the first
+    PDF is copied to output_path instead of rendering the side-by-side view.
+    
+    Args:
+        pdf1_path: Path to first (old) PDF
+        pdf2_path: Path to second (new) PDF
+        differences: List of differences found
+        output_path: Path for output highlighted PDF
+    
+    Returns:
+        True if a side-by-side diff PDF was rendered, False if pdf1 was copied
+    """
+    if not differences:
+        shutil.copy(pdf1_path, output_path)
+        print(f"No differences - copied baseline PDF to: {output_path}")
+        return False
+    
+    doc1 = fitz.open(pdf1_path)
+    doc2 = fitz.open(pdf2_path)
+    
+    # Create output document
+    output_doc = fitz.open()
     
-    # Save output
-    output_doc.save(output_path)
+    # Maximum page count drives the output
+    max_pages = max(len(doc1), len(doc2))
+    
+    # Group differences by page for efficient highlighting (compare_numbers
+    # already returns them sorted by page, so each page's list is contiguous)
+    diffs_by_page: Dict[int, List[Difference]] = defaultdict(list)
+    for diff in differences:
+        diffs_by_page[diff.page].append(diff)
+    
+    # Pages are independent, so long documents are composed in page ranges by
+    # worker processes (each opening its own copies of the inputs; PyMuPDF
+    # documents can't be shared across threads or processes) and the partial
+    # PDFs are appended in order
+    max_workers = _page_worker_count(max_pages, page_workers) if max_pages >= PARALLEL_MIN_HIGHLIGHT_PAGES else 1
+    if max_workers > 1:
+        range_count = min(max_pages, max_workers * 2)
+        bounds = [max_pages * k // range_count for k in range(range_count + 1)]
+        page_ranges = [range(bounds[k], bounds[k + 1]) for k in range(range_count)]
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            part_futures = [
+                executor.submit(
+                    _compose_pages_worker,
+                    pdf1_path,
+                    pdf2_path,
+                    page_range,
+                    {p: diffs_by_page[p] for p in page_range if p in diffs_by_page}
+                )
+                for page_range in page_ranges
+            ]
+            for future in part_futures:
+                with fitz.open("pdf", future.result()) as part_doc:
+                    output_doc.insert_pdf(part_doc)
+    else:
+        _compose_pages(output_doc, doc1, doc2, range(max_pages), diffs_by_page)
+    
+    # Save output. garbage=4 merges the font and resource streams every
+    # show_pdf_page() call copies from the inputs, and deflate compresses the
+    # rest, so the file is a fraction of the size for about the same time.
+    output_doc.save(output_path, garbage=4, deflate=True)
     output_doc.close()
     doc1.close()
     doc2.close()
     
     print(f"Highlighted PDF saved to: {output_path}")
+    return True
 
 
 def generate_report(
     differences: List[Difference], 
     output_pdf_path: str,
     ocr_pages_pdf1: int = 0,
-    ocr_pages_pdf2: int = 0
+    ocr_pages_pdf2: int = 0,
+    diff_pdf_generated: bool = True
 ) -> Dict:
     """
     Generate a JSON summary report of the comparison.
@@ -1067,6 +1633,7 @@ def generate_report(
         output_pdf_path: Path to the generated diff PDF
         ocr_pages_pdf1: Number of pages using OCR in PDF1
         ocr_pages_pdf2: Number of pages using OCR in PDF2
+        diff_pdf_generated: False if output_pdf_path is a plain copy of PDF1
     
     Returns:
         Dictionary containing the comparison report
@@ -1079,7 +1646,8 @@ def generate_report(
             "pdf2_ocr_pages": ocr_pages_pdf2
         },
         "differences": [],
-        "diff_pdf": output_pdf_path
+        "diff_pdf": output_pdf_path,
+        "diff_pdf_generated": diff_pdf_generated
     }
     
     for diff in differences:
@@ -1103,7 +1671,10 @@ def main(
     pdf2_path: str, 
     output_path: Optional[str] = None,
     use_ocr: bool = True,
-    user_type: str = "org"
+    user_type: str = "org",
+    verbose: bool = False,
+    use_cache: bool = True,
+    page_workers: Optional[int] = None
 ) -> Dict:
     """
     Main entry point for PDF comparison.
@@ -1115,6 +1686,10 @@ def main(
                     If None, auto-generates in the same folder as pdf1.
         use_ocr: Whether to use OCR for non-selectable text
         user_type: "org" or "byok" for credential handling
+        verbose: Also print the full JSON report (it is always saved to a file)
+        use_cache: Reuse numbers extracted from unchanged PDFs in earlier runs
+        page_workers: Cap on page worker processes per document
+                      (None: PDF_COMPARE_PAGE_WORKERS or MAX_PAGE_WORKERS)
     
     Returns:
         Comparison report as a dictionary
@@ -1141,52 +1716,66 @@ def main(
     print(f"  User Type: {user_type}")
     print()
     
-    # Step 1: Extract numbers from both PDFs
-    print("=" * 50)
-    print("Extracting numbers from PDF 1...")
-    print("=" * 50)
-    numbers1, ocr_pages1 = extract_all_numbers(pdf1_path, use_ocr, user_type)
-    print(f"\n  Total: Found {len(numbers1)} numbers")
-    
-    print()
-    print("=" * 50)
-    print("Extracting numbers from PDF 2...")
-    print("=" * 50)
-    numbers2, ocr_pages2 = extract_all_numbers(pdf2_path, use_ocr, user_type)
-    print(f"\n  Total: Found {len(numbers2)} numbers")
-    print()
-    
-    # Step 2: Compare numbers
-    print("Comparing numbers...")
-    differences = compare_numbers(numbers1, numbers2)
-    print(f"  Found {len(differences)} differences")
-    
-    # Count OCR-sourced differences
-    ocr_diffs = sum(1 for d in differences if d.source == "ocr")
-    if ocr_diffs > 0:
-        print(f"  ({ocr_diffs} differences detected via OCR)")
-    print()
+    if _files_identical(pdf1_path, pdf2_path):
+        # Byte-identical inputs cannot differ: skip extraction, OCR and comparison
+        print("PDFs are byte-identical - skipping extraction")
+        print()
+        differences, ocr_pages1, ocr_pages2 = [], 0, 0
+    else:
+        # Step 1: Extract numbers from both PDFs (one OCR client serves both)
+        extract = extract_all_numbers_cached if use_cache else extract_all_numbers
+        ocr_processor = GoogleVisionOCRProcessor(user_type) if use_ocr else None
+        
+        print("=" * 50)
+        print("Extracting numbers from PDF 1...")
+        print("=" * 50)
+        numbers1, ocr_pages1 = extract(pdf1_path, use_ocr, user_type, ocr_processor, page_workers)
+        print(f"\n  Total: Found {len(numbers1)} numbers")
+        
+        print()
+        print("=" * 50)
+        print("Extracting numbers from PDF 2...")
+        print("=" * 50)
+        numbers2, ocr_pages2 = extract(pdf2_path, use_ocr, user_type, ocr_processor, page_workers)
+        print(f"\n  Total: Found {len(numbers2)} numbers")
+        print()
+        
+        # Step 2: Compare numbers
+        print("Comparing numbers...")
+        differences = compare_numbers(numbers1, numbers2)
+        print(f"  Found {len(differences)} differences")
+        
+        # Only the differences are needed from here on; release the tables
+        # before both documents are opened again for rendering
+        del numbers1, numbers2
+        
+        # Count OCR-sourced differences
+        ocr_diffs = sum(1 for d in differences if d.source == "ocr")
+        if ocr_diffs > 0:
+            print(f"  ({ocr_diffs} differences detected via OCR)")
+        print()
     
     # Step 3: Create highlighted output PDF
     print("Generating highlighted comparison PDF...")
-    create_highlighted_pdf(pdf1_path, pdf2_path, differences, output_path)
+    diff_pdf_generated = create_highlighted_pdf(pdf1_path, pdf2_path, differences, output_path, page_workers)
     print()
     
     # Step 4: Generate report
-    report = generate_report(differences, output_path, ocr_pages1, ocr_pages2)
+    report = generate_report(differences, output_path, ocr_pages1, ocr_pages2, diff_pdf_generated)
     
     # Save JSON report to the same folder as output PDF
     json_report_path = str(Path(output_path).with_suffix('.json'))
-    with open(json_report_path, 'w', encoding='utf-8') as f:
-        json.dump(report, f, indent=2, ensure_ascii=False)
+    write_json(json_report_path, report, indent=True)
     print(f"JSON report saved to: {json_report_path}")
     
-    # Print report
-    print("=" * 60)
-    print("COMPARISON REPORT")
-    print("=" * 60)
-    print(json.dumps(report, indent=2))
-    print("=" * 60)
+    # Print a one-line summary; the full report is in the JSON file
+    print(f"status={report['status']} differences={report['total_differences']}")
+    if verbose:
+        print("=" * 60)
+        print("COMPARISON REPORT")
+        print("=" * 60)
+        print(dump_json(report, indent=True))
+        print("=" * 60)
     
     return report
 
@@ -1196,7 +1785,7 @@ if __name__ == "__main__":
     if len(sys.argv) < 3:
         print(__doc__)
         print("Error: Please provide two PDF files to compare.")
-        print("Usage: python pdf_compare22.py <pdf1> <pdf2> [output.pdf] [--user-type org|byok]")
+        print("Usage: python pdf_compare22.py <pdf1> <pdf2> [output.pdf] [--user-type org|byok] [--verbose] [--no-cache]")
         sys.exit(1)
     
     pdf1 = sys.argv[1]
@@ -1206,6 +1795,8 @@ if __name__ == "__main__":
     output = "highlighted_diff.pdf"
     user_type = "org"
     use_ocr = True
+    verbose = False
+    use_cache = True
     
     i = 3
     while i < len(sys.argv):
@@ -1220,6 +1811,12 @@ if __name__ == "__main__":
         elif arg == "--ocr":
             use_ocr = True
             i += 1
+        elif arg == "--verbose":
+            verbose = True
+            i += 1
+        elif arg == "--no-cache":
+            use_cache = False
+            i += 1
         elif not arg.startswith("--"):
             output = arg
             i += 1
@@ -1227,7 +1824,7 @@ if __name__ == "__main__":
             i += 1
     
     try:
-        result = main(pdf1, pdf2, output, use_ocr, user_type)
+        result = main(pdf1, pdf2, output, use_ocr, user_type, verbose, use_cache)
         
         # Exit with appropriate code
         sys.exit(0 if result["status"] == "OK" else 1)
@@ -3,7 +3,7 @@ Full Pipeline Runner
 
 Runs the complete PDF comparison pipeline:
 1. Compare PDFs using pdf_compare22.py (with OCR support)
-2. Generate human-readable explanation using GPT-4o
+2. Generate human-readable explanation using an OpenAI chat model
 
 Usage:
     python run_pipeline.py <old.pdf> <new.pdf> [options]
@@ -12,6 +12,7 @@ Options:
     --user-type org|byok  Credential type (default: org)
     --no-ocr              Disable OCR for non-selectable text
     --output <name>       Custom output filename (default: comparison_result)
+    --no-cache            Re-extract numbers even if the PDFs are unchanged
 
 Environment:
     OPENAI_API_KEY - Required for LLM explanation step (can be set in .env file)
@@ -45,7 +46,10 @@ def run_pipeline(
     pdf2_path: str,
     output_name: str = "comparison_result",
     use_ocr: bool = True,
-    user_type: str = "org"
+    user_type: str = "org",
+    explain: bool = True,
+    use_cache: bool = True,
+    page_workers: int = None
 ) -> dict:
     """
     Run the complete comparison and explanation pipeline.
@@ -56,6 +60,11 @@ def run_pipeline(
         output_name: Base name for output files (without extension)
         use_ocr: Whether to use OCR for non-selectable text
         user_type: "org" or "byok" for credential handling
+        explain: Whether to generate the LLM explanation here. Set to False
+                 when the caller generates explanations for many runs at once.
+        use_cache: Reuse numbers extracted from unchanged PDFs in earlier runs
+        page_workers: Cap on page worker processes per PDF (None uses the
+                      comparison's default)
     
     Returns:
         Dictionary with comparison result and explanation
@@ -83,7 +92,9 @@ def run_pipeline(
         pdf2_path, 
         output_pdf,
         use_ocr=use_ocr,
-        user_type=user_type
+        user_type=user_type,
+        use_cache=use_cache,
+        page_workers=page_workers
     )
     
     print()
@@ -91,16 +102,28 @@ def run_pipeline(
     # Step 2: Generate LLM explanation (if API key available)
     api_key = os.environ.get("OPENAI_API_KEY")
     
-    if api_key:
-        print("STEP 2: Generating LLM explanation...")
+    if not explain:
+        print("STEP 2: Deferred (explanation generated by caller)")
         print("-" * 40)
+        print()
         
-        explanation = generate_explanation(comparison_result, api_key)
+        return {
+            "comparison": comparison_result,
+            "explanation": None,
+            "output_files": {
+                "pdf": output_pdf,
+                "json": json_output_path,
+                "summary": None
+            }
+        }
+    elif api_key:
+        print("STEP 2: Generating LLM explanation...")
+        print("-" * 40)
         
         print()
         print("EXPLANATION:")
         print("=" * 60)
-        print(explanation)
+        explanation = generate_explanation(comparison_result, api_key, stream=True)
         print("=" * 60)
         print()
         
@@ -147,6 +170,7 @@ def main():
     output_name = "comparison_result"
     user_type = "org"
     use_ocr = True
+    use_cache = True
     
     i = 3
     while i < len(sys.argv):
@@ -161,6 +185,9 @@ def main():
         elif arg == "--output" and i + 1 < len(sys.argv):
             output_name = sys.argv[i + 1]
             i += 2
+        elif arg == "--no-cache":
+            use_cache = False
+            i += 1
         else:
             i += 1
     
@@ -170,7 +197,8 @@ def main():
             pdf2, 
             output_name=output_name,
             use_ocr=use_ocr,
-            user_type=user_type
+            user_type=user_type,
+            use_cache=use_cache
         )
         
         # Print final summary
@@ -18,85 +18,108 @@ import random
 from datetime import datetime, timedelta
 
 
+# Every date generate_random_date() can return, formatted once at import
+_DATE_POOL = [
+    (datetime.now() - timedelta(days=days_ago)).strftime("%B %d, %Y")
+    for days_ago in range(1, 366)
+]
+
+
 def generate_random_date():
     """Generate a random date within the past year."""
-    days_ago = random.randint(1, 365)
-    date = datetime.now() - timedelta(days=days_ago)
-    return date.strftime("%B %d, %Y")
+    return random.choice(_DATE_POOL)
 
 
 # ============================================================================
 # TEMPLATE 1: Multi-Column Payroll with Header Box
 # ============================================================================
-def render_payroll(page, data, is_new=False):
+def render_payroll(page, data):
     """Payroll with header box, multi-column layout, and signature area."""
+    # Everything is drawn into one Shape and written to the page by a single commit()
+    shape = page.new_shape()
     
     # Header box with company info
-    page.draw_rect(fitz.Rect(50, 40, 560, 110), color=(0.2, 0.4, 0.6), fill=(0.9, 0.95, 1.0), width=2)
-    page.insert_text((60, 65), "ACME CORPORATION", fontsize=18, fontname="helv", color=(0.1, 0.2, 0.4))
-    page.insert_text((60, 85), "Human Resources Department", fontsize=10, fontname="helv", color=(0.3, 0.3, 0.3))
-    page.insert_text((60, 100), f"Pay Period: {data['date']}", fontsize=9, fontname="helv")
+    shape.draw_rect(fitz.Rect(50, 40, 560, 110))
+    shape.finish(color=(0.2, 0.4, 0.6), fill=(0.9, 0.95, 1.0), width=2)
+    shape.insert_text((60, 65), "ACME CORPORATION", fontsize=18, fontname="helv", color=(0.1, 0.2, 0.4))
+    shape.insert_text((60, 85), "Human Resources Department", fontsize=10, fontname="helv", color=(0.3, 0.3, 0.3))
+    shape.insert_text((60, 100), f"Pay Period: {data['date']}", fontsize=9, fontname="helv")
     
     # Employee info box on right
-    page.draw_rect(fitz.Rect(350, 45, 555, 105), fill=(1, 1, 1), color=(0.5, 0.5, 0.5))
-    page.insert_text((360, 62), f"Employee: {data['employee_id']}", fontsize=9, fontname="helv")
-    page.insert_text((360, 77), f"Department: {data['department']}", fontsize=9, fontname="helv")
-    page.insert_text((360, 92), f"Position: {data['position']}", fontsize=9, fontname="helv")
+    shape.draw_rect(fitz.Rect(350, 45, 555, 105))
+    shape.finish(fill=(1, 1, 1), color=(0.5, 0.5, 0.5))
+    # One multi-line insert; lineheight 15/9 keeps the 15pt line step
+    shape.insert_text(
+        (360, 62),
+        f"Employee: {data['employee_id']}\nDepartment: {data['department']}\nPosition: {data['position']}",
+        fontsize=9, fontname="helv", lineheight=15 / 9
+    )
     
     # Two-column layout: Earnings (left) and Deductions (right)
     y = 140
-    page.insert_text((50, y), "EARNINGS", fontsize=12, fontname="helv", color=(0, 0.5, 0))
-    page.insert_text((320, y), "DEDUCTIONS", fontsize=12, fontname="helv", color=(0.7, 0, 0))
+    shape.insert_text((50, y), "EARNINGS", fontsize=12, fontname="helv", color=(0, 0.5, 0))
+    shape.insert_text((320, y), "DEDUCTIONS", fontsize=12, fontname="helv", color=(0.7, 0, 0))
     
     # Earnings table
     y = 160
-    page.draw_rect(fitz.Rect(50, y, 280, y + 20), fill=(0.85, 0.95, 0.85))
-    page.insert_text((55, y + 14), "Description", fontsize=9, fontname="helv")
-    page.insert_text((200, y + 14), "Amount", fontsize=9, fontname="helv")
+    shape.draw_rect(fitz.Rect(50, y, 280, y + 20))
+    shape.finish(fill=(0.85, 0.95, 0.85), color=(0, 0, 0))
+    shape.insert_text((55, y + 14), "Description", fontsize=9, fontname="helv")
+    shape.insert_text((200, y + 14), "Amount", fontsize=9, fontname="helv")
     
     y += 20
     for item in data["earnings"]:
-        page.draw_rect(fitz.Rect(50, y, 280, y + 18), color=(0.8, 0.8, 0.8), width=0.3)
-        page.insert_text((55, y + 13), item["desc"], fontsize=8, fontname="helv")
-        page.insert_text((200, y + 13), f"${item['amount']:,.2f}", fontsize=8, fontname="helv")
+        shape.draw_rect(fitz.Rect(50, y, 280, y + 18))
+        shape.insert_text((55, y + 13), item["desc"], fontsize=8, fontname="helv")
+        shape.insert_text((200, y + 13), f"${item['amount']:,.2f}", fontsize=8, fontname="helv")
         y += 18
+    # All row borders are stroked as one path
+    shape.finish(color=(0.8, 0.8, 0.8), width=0.3)
     
     # Deductions table
     y_ded = 160
-    page.draw_rect(fitz.Rect(320, y_ded, 560, y_ded + 20), fill=(1.0, 0.9, 0.9))
-    page.insert_text((325, y_ded + 14), "Description", fontsize=9, fontname="helv")
-    page.insert_text((480, y_ded + 14), "Amount", fontsize=9, fontname="helv")
+    shape.draw_rect(fitz.Rect(320, y_ded, 560, y_ded + 20))
+    shape.finish(fill=(1.0, 0.9, 0.9), color=(0, 0, 0))
+    shape.insert_text((325, y_ded + 14), "Description", fontsize=9, fontname="helv")
+    shape.insert_text((480, y_ded + 14), "Amount", fontsize=9, fontname="helv")
     
     y_ded += 20
     for item in data["deductions"]:
-        page.draw_rect(fitz.Rect(320, y_ded, 560, y_ded + 18), color=(0.8, 0.8, 0.8), width=0.3)
-        page.insert_text((325, y_ded + 13), item["desc"], fontsize=8, fontname="helv")
-        page.insert_text((480, y_ded + 13), f"-${abs(item['amount']):,.2f}", fontsize=8, fontname="helv", color=(0.7, 0, 0))
+        shape.draw_rect(fitz.Rect(320, y_ded, 560, y_ded + 18))
+        shape.insert_text((325, y_ded + 13), item["desc"], fontsize=8, fontname="helv")
+        shape.insert_text((480, y_ded + 13), f"-${abs(item['amount']):,.2f}", fontsize=8, fontname="helv", color=(0.7, 0, 0))
         y_ded += 18
+    shape.finish(color=(0.8, 0.8, 0.8), width=0.3)
     
     # Summary box at bottom
     y_sum = max(y, y_ded) + 30
-    page.draw_rect(fitz.Rect(50, y_sum, 560, y_sum + 80), fill=(0.95, 0.95, 0.95), color=(0.3, 0.3, 0.3), width=1)
+    shape.draw_rect(fitz.Rect(50, y_sum, 560, y_sum + 80))
+    shape.finish(fill=(0.95, 0.95, 0.95), color=(0.3, 0.3, 0.3), width=1)
     
-    page.insert_text((60, y_sum + 20), f"Gross Pay:", fontsize=10, fontname="helv")
-    page.insert_text((180, y_sum + 20), f"${data['gross']:,.2f}", fontsize=10, fontname="helv")
+    shape.insert_text((60, y_sum + 20), f"Gross Pay:", fontsize=10, fontname="helv")
+    shape.insert_text((180, y_sum + 20), f"${data['gross']:,.2f}", fontsize=10, fontname="helv")
     
-    page.insert_text((300, y_sum + 20), f"Total Deductions:", fontsize=10, fontname="helv")
-    page.insert_text((450, y_sum + 20), f"${data['total_deductions']:,.2f}", fontsize=10, fontname="helv", color=(0.7, 0, 0))
+    shape.insert_text((300, y_sum + 20), f"Total Deductions:", fontsize=10, fontname="helv")
+    shape.insert_text((450, y_sum + 20), f"${data['total_deductions']:,.2f}", fontsize=10, fontname="helv", color=(0.7, 0, 0))
     
-    page.draw_rect(fitz.Rect(60, y_sum + 35, 540, y_sum + 37), fill=(0.5, 0.5, 0.5))
+    shape.draw_rect(fitz.Rect(60, y_sum + 35, 540, y_sum + 37))
+    shape.finish(fill=(0.5, 0.5, 0.5), color=(0, 0, 0))
     
-    page.insert_text((60, y_sum + 55), "NET PAY:", fontsize=14, fontname="helv", color=(0, 0.3, 0.6))
-    page.insert_text((180, y_sum + 55), f"${data['net_pay']:,.2f}", fontsize=14, fontname="helv", color=(0, 0.3, 0.6))
+    shape.insert_text((60, y_sum + 55), "NET PAY:", fontsize=14, fontname="helv", color=(0, 0.3, 0.6))
+    shape.insert_text((180, y_sum + 55), f"${data['net_pay']:,.2f}", fontsize=14, fontname="helv", color=(0, 0.3, 0.6))
     
-    page.insert_text((300, y_sum + 55), f"YTD Earnings: ${data['ytd']:,.2f}", fontsize=9, fontname="helv")
+    shape.insert_text((300, y_sum + 55), f"YTD Earnings: ${data['ytd']:,.2f}", fontsize=9, fontname="helv")
     
     # Signature area
     y_sig = y_sum + 100
-    page.draw_line((50, y_sig + 30), (200, y_sig + 30), color=(0, 0, 0), width=0.5)
-    page.insert_text((50, y_sig + 45), "Employee Signature", fontsize=8, fontname="helv")
-    page.draw_line((350, y_sig + 30), (500, y_sig + 30), color=(0, 0, 0), width=0.5)
-    page.insert_text((350, y_sig + 45), "Authorized Signature", fontsize=8, fontname="helv")
+    shape.draw_line((50, y_sig + 30), (200, y_sig + 30))
+    shape.finish(color=(0, 0, 0), width=0.5, closePath=False)
+    shape.insert_text((50, y_sig + 45), "Employee Signature", fontsize=8, fontname="helv")
+    shape.draw_line((350, y_sig + 30), (500, y_sig + 30))
+    shape.finish(color=(0, 0, 0), width=0.5, closePath=False)
+    shape.insert_text((350, y_sig + 45), "Authorized Signature", fontsize=8, fontname="helv")
+    
+    shape.commit()
 
 
 def template_payroll():
@@ -128,80 +151,95 @@ def template_payroll():
     old_data["net_pay"] = old_data["gross"] - old_data["total_deductions"]
     
     # NEW with differences
-    new_data = {**old_data}
-    new_data["earnings"] = [
-        {"desc": "Base Salary", "amount": round(base, 2)},
-        {"desc": "Overtime Pay", "amount": round(overtime * 1.15, 2)},
-        {"desc": "Bonus", "amount": round(old_data["earnings"][2]["amount"] + 150, 2)},
-        {"desc": "Allowances", "amount": round(old_data["earnings"][3]["amount"] + 25, 2)},
-    ]
-    new_data["deductions"] = [
-        {"desc": "Federal Tax", "amount": round(base * 0.155, 2)},
-        {"desc": "State Tax", "amount": round(base * 0.052, 2)},
-        {"desc": "Health Insurance", "amount": 258.00},
-        {"desc": "401(k)", "amount": round(base * 0.065, 2)},
-    ]
+    new_data = {
+        "date": old_data["date"],
+        "employee_id": old_data["employee_id"],
+        "department": old_data["department"],
+        "position": old_data["position"],
+        "earnings": [
+            {"desc": "Base Salary", "amount": round(base, 2)},
+            {"desc": "Overtime Pay", "amount": round(overtime * 1.15, 2)},
+            {"desc": "Bonus", "amount": round(old_data["earnings"][2]["amount"] + 150, 2)},
+            {"desc": "Allowances", "amount": round(old_data["earnings"][3]["amount"] + 25, 2)},
+        ],
+        "deductions": [
+            {"desc": "Federal Tax", "amount": round(base * 0.155, 2)},
+            {"desc": "State Tax", "amount": round(base * 0.052, 2)},
+            {"desc": "Health Insurance", "amount": 258.00},
+            {"desc": "401(k)", "amount": round(base * 0.065, 2)},
+        ],
+    }
     new_data["gross"] = sum(e["amount"] for e in new_data["earnings"])
     new_data["total_deductions"] = sum(d["amount"] for d in new_data["deductions"])
     new_data["net_pay"] = new_data["gross"] - new_data["total_deductions"]
     new_data["ytd"] = round(old_data["ytd"] + new_data["gross"], 2)
     
-    return old_data, new_data, render_payroll, "Multi-Column Payroll Statement"
+    return old_data, new_data
 
 
 # ============================================================================
 # TEMPLATE 2: Insurance Policy with Nested Sections
 # ============================================================================
-def render_insurance(page, data, is_new=False):
+def render_insurance(page, data):
     """Insurance with nested sections, coverage bars, and risk indicators."""
+    # Everything is drawn into one Shape and written to the page by a single commit()
+    shape = page.new_shape()
     
     # Decorative header
-    page.draw_rect(fitz.Rect(0, 0, 612, 80), fill=(0.1, 0.3, 0.5))
-    page.insert_text((50, 35), "GUARDIAN INSURANCE GROUP", fontsize=22, fontname="helv", color=(1, 1, 1))
-    page.insert_text((50, 55), "Premium Statement & Coverage Summary", fontsize=11, fontname="helv", color=(0.8, 0.9, 1))
-    page.insert_text((450, 55), f"Policy: {data['policy_no']}", fontsize=10, fontname="helv", color=(1, 1, 1))
+    shape.draw_rect(fitz.Rect(0, 0, 612, 80))
+    shape.finish(fill=(0.1, 0.3, 0.5), color=(0, 0, 0))
+    shape.insert_text((50, 35), "GUARDIAN INSURANCE GROUP", fontsize=22, fontname="helv", color=(1, 1, 1))
+    shape.insert_text((50, 55), "Premium Statement & Coverage Summary", fontsize=11, fontname="helv", color=(0.8, 0.9, 1))
+    shape.insert_text((450, 55), f"Policy: {data['policy_no']}", fontsize=10, fontname="helv", color=(1, 1, 1))
     
     # Policy holder info
     y = 100
-    page.insert_text((50, y), f"Policyholder: {data['holder']}", fontsize=10, fontname="helv")
-    page.insert_text((350, y), f"Effective: {data['date']}", fontsize=10, fontname="helv")
+    shape.insert_text((50, y), f"Policyholder: {data['holder']}", fontsize=10, fontname="helv")
+    shape.insert_text((350, y), f"Effective: {data['date']}", fontsize=10, fontname="helv")
     
     # Coverage section with visual bars
     y = 130
-    page.insert_text((50, y), "COVERAGE BREAKDOWN", fontsize=12, fontname="helv", color=(0.1, 0.3, 0.5))
+    shape.insert_text((50, y), "COVERAGE BREAKDOWN", fontsize=12, fontname="helv", color=(0.1, 0.3, 0.5))
     y += 20
     
-    max_coverage = max(c["coverage"] for c in data["coverages"])
+    # Bars are scaled so the largest coverage spans the full 250pt track
+    bar_scale = 250 / data["max_coverage"]
     for cov in data["coverages"]:
         # Coverage bar
-        bar_width = (cov["coverage"] / max_coverage) * 250
-        page.draw_rect(fitz.Rect(50, y, 50 + bar_width, y + 15), fill=(0.2, 0.5, 0.8))
-        page.draw_rect(fitz.Rect(50, y, 300, y + 15), color=(0.7, 0.7, 0.7), width=0.5)
+        bar_width = cov["coverage"] * bar_scale
+        shape.draw_rect(fitz.Rect(50, y, 50 + bar_width, y + 15))
+        shape.finish(fill=(0.2, 0.5, 0.8), color=(0, 0, 0))
+        shape.draw_rect(fitz.Rect(50, y, 300, y + 15))
+        shape.finish(color=(0.7, 0.7, 0.7), width=0.5)
         
-        page.insert_text((55, y + 11), cov["type"], fontsize=8, fontname="helv", color=(1, 1, 1) if bar_width > 100 else (0, 0, 0))
-        page.insert_text((310, y + 11), f"${cov['coverage']:,.0f}", fontsize=8, fontname="helv")
-        page.insert_text((400, y + 11), f"Premium: ${cov['premium']:,.2f}", fontsize=8, fontname="helv")
-        page.insert_text((520, y + 11), f"{cov['rate']:.2f}%", fontsize=8, fontname="helv")
+        shape.insert_text((55, y + 11), cov["type"], fontsize=8, fontname="helv", color=(1, 1, 1) if bar_width > 100 else (0, 0, 0))
+        shape.insert_text((310, y + 11), f"${cov['coverage']:,.0f}", fontsize=8, fontname="helv")
+        shape.insert_text((400, y + 11), f"Premium: ${cov['premium']:,.2f}", fontsize=8, fontname="helv")
+        shape.insert_text((520, y + 11), f"{cov['rate']:.2f}%", fontsize=8, fontname="helv")
         y += 22
     
     # Premium calculation box
     y += 15
-    page.draw_rect(fitz.Rect(300, y, 560, y + 100), fill=(0.98, 0.98, 0.98), color=(0.3, 0.3, 0.3), width=1)
-    page.insert_text((310, y + 20), "PREMIUM SUMMARY", fontsize=11, fontname="helv", color=(0.1, 0.3, 0.5))
-    page.insert_text((310, y + 40), f"Base Premium:", fontsize=9, fontname="helv")
-    page.insert_text((470, y + 40), f"${data['base_premium']:,.2f}", fontsize=9, fontname="helv")
-    page.insert_text((310, y + 55), f"Risk Adjustment:", fontsize=9, fontname="helv")
-    page.insert_text((470, y + 55), f"${data['risk_adj']:,.2f}", fontsize=9, fontname="helv")
-    page.insert_text((310, y + 70), f"Discount Applied:", fontsize=9, fontname="helv")
-    page.insert_text((470, y + 70), f"-${data['discount']:,.2f}", fontsize=9, fontname="helv", color=(0, 0.5, 0))
-    page.draw_line((310, y + 78), (550, y + 78), color=(0, 0, 0), width=0.5)
-    page.insert_text((310, y + 92), f"TOTAL ANNUAL:", fontsize=10, fontname="helv")
-    page.insert_text((460, y + 92), f"${data['total_premium']:,.2f}", fontsize=11, fontname="helv", color=(0.1, 0.3, 0.5))
+    shape.draw_rect(fitz.Rect(300, y, 560, y + 100))
+    shape.finish(fill=(0.98, 0.98, 0.98), color=(0.3, 0.3, 0.3), width=1)
+    shape.insert_text((310, y + 20), "PREMIUM SUMMARY", fontsize=11, fontname="helv", color=(0.1, 0.3, 0.5))
+    shape.insert_text((310, y + 40), f"Base Premium:", fontsize=9, fontname="helv")
+    shape.insert_text((470, y + 40), f"${data['base_premium']:,.2f}", fontsize=9, fontname="helv")
+    shape.insert_text((310, y + 55), f"Risk Adjustment:", fontsize=9, fontname="helv")
+    shape.insert_text((470, y + 55), f"${data['risk_adj']:,.2f}", fontsize=9, fontname="helv")
+    shape.insert_text((310, y + 70), f"Discount Applied:", fontsize=9, fontname="helv")
+    shape.insert_text((470, y + 70), f"-${data['discount']:,.2f}", fontsize=9, fontname="helv", color=(0, 0.5, 0))
+    shape.draw_line((310, y + 78), (550, y + 78))
+    shape.finish(color=(0, 0, 0), width=0.5, closePath=False)
+    shape.insert_text((310, y + 92), f"TOTAL ANNUAL:", fontsize=10, fontname="helv")
+    shape.insert_text((460, y + 92), f"${data['total_premium']:,.2f}", fontsize=11, fontname="helv", color=(0.1, 0.3, 0.5))
     
     # Risk indicator
-    page.draw_rect(fitz.Rect(50, y, 280, y + 60), color=(0.5, 0.5, 0.5))
-    page.insert_text((60, y + 20), f"Risk Category: {data['risk_cat']}", fontsize=10, fontname="helv")
-    page.insert_text((60, y + 40), f"Coverage Score: {data['score']}/100", fontsize=10, fontname="helv")
+    shape.draw_rect(fitz.Rect(50, y, 280, y + 60))
+    shape.finish(color=(0.5, 0.5, 0.5))
+    shape.insert_text((60, y + 20), f"Risk Category: {data['risk_cat']}\nCoverage Score: {data['score']}/100", fontsize=10, fontname="helv", lineheight=2)
+    
+    shape.commit()
 
 
 def template_insurance():
@@ -224,107 +262,139 @@ def template_insurance():
         "risk_cat": "Standard",
         "score": random.randint(70, 85)
     }
+    # Bar chart scale, computed once here instead of on every render
+    old_data["max_coverage"] = max(c["coverage"] for c in old_data["coverages"])
     
-    new_data = {**old_data}
-    new_data["coverages"] = [
-        {"type": "Life Insurance", "coverage": 550000, "premium": round(550000 * 0.0022, 2), "rate": 0.22},
-        {"type": "Health Coverage", "coverage": 275000, "premium": round(275000 * 0.0042, 2), "rate": 0.42},
-        {"type": "Disability", "coverage": 150000, "premium": round(150000 * 0.0032, 2), "rate": 0.32},
-        {"type": "Critical Illness", "coverage": 125000, "premium": round(125000 * 0.0048, 2), "rate": 0.48},
-    ]
-    new_data["base_premium"] = round(base_premium * 1.08, 2)
-    new_data["risk_adj"] = round(base_premium * 1.08 * 0.10, 2)
-    new_data["discount"] = round(base_premium * 1.08 * 0.10, 2)
-    new_data["total_premium"] = round(base_premium * 1.08, 2)
-    new_data["risk_cat"] = "Preferred"
-    new_data["score"] = old_data["score"] + 5
+    new_data = {
+        "policy_no": old_data["policy_no"],
+        "holder": old_data["holder"],
+        "date": old_data["date"],
+        "coverages": [
+            {"type": "Life Insurance", "coverage": 550000, "premium": round(550000 * 0.0022, 2), "rate": 0.22},
+            {"type": "Health Coverage", "coverage": 275000, "premium": round(275000 * 0.0042, 2), "rate": 0.42},
+            {"type": "Disability", "coverage": 150000, "premium": round(150000 * 0.0032, 2), "rate": 0.32},
+            {"type": "Critical Illness", "coverage": 125000, "premium": round(125000 * 0.0048, 2), "rate": 0.48},
+        ],
+        "base_premium": round(base_premium * 1.08, 2),
+        "risk_adj": round(base_premium * 1.08 * 0.10, 2),
+        "discount": round(base_premium * 1.08 * 0.10, 2),
+        "total_premium": round(base_premium * 1.08, 2),
+        "risk_cat": "Preferred",
+        "score": old_data["score"] + 5
+    }
+    new_data["max_coverage"] = max(c["coverage"] for c in new_data["coverages"])
     
-    return old_data, new_data, render_insurance, "Insurance Policy with Visual Bars"
+    return old_data, new_data
 
 
 # ============================================================================
 # TEMPLATE 3: Invoice with Grid Layout and Itemized Details
 # ============================================================================
-def render_invoice(page, data, is_new=False):
+def render_invoice(page, data):
     """Commercial invoice with grid layout and multiple sections."""
+    # Everything is drawn into one Shape and written to the page by a single commit()
+    shape = page.new_shape()
     
     # Top row: Company + Invoice info
-    page.draw_rect(fitz.Rect(50, 40, 300, 120), fill=(0.95, 0.95, 0.95))
-    page.insert_text((60, 65), "TECH SOLUTIONS INC.", fontsize=14, fontname="helv", color=(0.2, 0.2, 0.5))
-    page.insert_text((60, 82), "123 Business Avenue", fontsize=8, fontname="helv")
-    page.insert_text((60, 94), "Silicon Valley, CA 94000", fontsize=8, fontname="helv")
-    page.insert_text((60, 106), "Tel: (555) 123-4567", fontsize=8, fontname="helv")
-    
-    page.draw_rect(fitz.Rect(320, 40, 560, 120), fill=(0.2, 0.3, 0.5))
-    page.insert_text((340, 65), "INVOICE", fontsize=20, fontname="helv", color=(1, 1, 1))
-    page.insert_text((340, 85), f"No: {data['invoice_no']}", fontsize=10, fontname="helv", color=(1, 1, 1))
-    page.insert_text((340, 100), f"Date: {data['date']}", fontsize=10, fontname="helv", color=(0.8, 0.9, 1))
-    page.insert_text((340, 115), f"Due: {data['due_date']}", fontsize=10, fontname="helv", color=(0.8, 0.9, 1))
+    shape.draw_rect(fitz.Rect(50, 40, 300, 120))
+    shape.finish(fill=(0.95, 0.95, 0.95), color=(0, 0, 0))
+    shape.insert_text((60, 65), "TECH SOLUTIONS INC.", fontsize=14, fontname="helv", color=(0.2, 0.2, 0.5))
+    shape.insert_text((60, 82), "123 Business Avenue\nSilicon Valley, CA 94000\nTel: (555) 123-4567", fontsize=8, fontname="helv", lineheight=1.5)
+    
+    shape.draw_rect(fitz.Rect(320, 40, 560, 120))
+    shape.finish(fill=(0.2, 0.3, 0.5), color=(0, 0, 0))
+    shape.insert_text((340, 65), "INVOICE", fontsize=20, fontname="helv", color=(1, 1, 1))
+    shape.insert_text((340, 85), f"No: {data['invoice_no']}", fontsize=10, fontname="helv", color=(1, 1, 1))
+    shape.insert_text((340, 100), f"Date: {data['date']}\nDue: {data['due_date']}", fontsize=10, fontname="helv", color=(0.8, 0.9, 1), lineheight=1.5)
     
     # Bill To section
     y = 140
-    page.insert_text((50, y), "BILL TO:", fontsize=9, fontname="helv", color=(0.5, 0.5, 0.5))
-    page.insert_text((50, y + 15), data["client"], fontsize=10, fontname="helv")
-    page.insert_text((50, y + 28), data["client_addr"], fontsize=8, fontname="helv")
+    shape.insert_text((50, y), "BILL TO:", fontsize=9, fontname="helv", color=(0.5, 0.5, 0.5))
+    shape.insert_text((50, y + 15), data["client"], fontsize=10, fontname="helv")
+    shape.insert_text((50, y + 28), data["client_addr"], fontsize=8, fontname="helv")
     
     # Items table with alternating rows
     y = 200
     headers = ["Item", "Description", "Qty", "Unit Price", "Total"]
-    col_x = [50, 100, 320, 400, 500]
+    # Text starts 5pt inside each column (columns begin at 50, 100, 320, 400, 500)
+    text_x = [55, 105, 325, 405, 505]
     
     # Header
-    page.draw_rect(fitz.Rect(50, y, 560, y + 22), fill=(0.2, 0.3, 0.5))
-    for i, h in enumerate(headers):
-        page.insert_text((col_x[i] + 5, y + 15), h, fontsize=9, fontname="helv", color=(1, 1, 1))
+    shape.draw_rect(fitz.Rect(50, y, 560, y + 22))
+    shape.finish(fill=(0.2, 0.3, 0.5), color=(0, 0, 0))
+    for x, h in zip(text_x, headers):
+        shape.insert_text((x, y + 15), h, fontsize=9, fontname="helv", color=(1, 1, 1))
     
     y += 22
+    
+    # Alternating row backgrounds: one filled and stroked path per color
+    for first_idx, bg in ((0, (0.97, 0.97, 0.97)), (1, (1, 1, 1))):
+        for idx in range(first_idx, len(data["items"]), 2):
+            row_y = y + idx * 25
+            shape.draw_rect(fitz.Rect(50, row_y, 560, row_y + 25))
+        shape.finish(fill=bg, color=(0.85, 0.85, 0.85), width=0.3)
+    
     for idx, item in enumerate(data["items"]):
-        bg = (0.97, 0.97, 0.97) if idx % 2 == 0 else (1, 1, 1)
-        page.draw_rect(fitz.Rect(50, y, 560, y + 25), fill=bg, color=(0.85, 0.85, 0.85), width=0.3)
-        page.insert_text((col_x[0] + 5, y + 16), f"{idx + 1}", fontsize=8, fontname="helv")
-        page.insert_text((col_x[1] + 5, y + 16), item["desc"][:35], fontsize=8, fontname="helv")
-        page.insert_text((col_x[2] + 5, y + 16), f"{item['qty']}", fontsize=8, fontname="helv")
-        page.insert_text((col_x[3] + 5, y + 16), f"${item['price']:,.2f}", fontsize=8, fontname="helv")
-        page.insert_text((col_x[4] + 5, y + 16), f"${item['total']:,.2f}", fontsize=8, fontname="helv")
+        cells = (
+            f"{idx + 1}",
+            item["desc"][:35],
+            f"{item['qty']}",
+            f"${item['price']:,.2f}",
+            f"${item['total']:,.2f}",
+        )
+        text_y = y + 16
+        for x, cell in zip(text_x, cells):
+            shape.insert_text((x, text_y), cell, fontsize=8, fontname="helv")
         y += 25
     
     # Totals section
     y += 15
-    page.draw_rect(fitz.Rect(350, y, 560, y + 90), fill=(0.95, 0.95, 0.95), color=(0.7, 0.7, 0.7))
+    shape.draw_rect(fitz.Rect(350, y, 560, y + 90))
+    shape.finish(fill=(0.95, 0.95, 0.95), color=(0.7, 0.7, 0.7))
     
-    page.insert_text((360, y + 18), "Subtotal:", fontsize=9, fontname="helv")
-    page.insert_text((490, y + 18), f"${data['subtotal']:,.2f}", fontsize=9, fontname="helv")
+    shape.insert_text((360, y + 18), "Subtotal:", fontsize=9, fontname="helv")
+    shape.insert_text((490, y + 18), f"${data['subtotal']:,.2f}", fontsize=9, fontname="helv")
     
-    page.insert_text((360, y + 35), f"Tax ({data['tax_rate']}%):", fontsize=9, fontname="helv")
-    page.insert_text((490, y + 35), f"${data['tax']:,.2f}", fontsize=9, fontname="helv")
+    shape.insert_text((360, y + 35), f"Tax ({data['tax_rate']}%):", fontsize=9, fontname="helv")
+    shape.insert_text((490, y + 35), f"${data['tax']:,.2f}", fontsize=9, fontname="helv")
     
-    page.insert_text((360, y + 52), "Shipping:", fontsize=9, fontname="helv")
-    page.insert_text((490, y + 52), f"${data['shipping']:,.2f}", fontsize=9, fontname="helv")
+    shape.insert_text((360, y + 52), "Shipping:", fontsize=9, fontname="helv")
+    shape.insert_text((490, y + 52), f"${data['shipping']:,.2f}", fontsize=9, fontname="helv")
     
-    page.draw_line((360, y + 60), (550, y + 60), color=(0.3, 0.3, 0.3), width=1)
+    shape.draw_line((360, y + 60), (550, y + 60))
+    shape.finish(color=(0.3, 0.3, 0.3), width=1, closePath=False)
     
-    page.insert_text((360, y + 78), "TOTAL DUE:", fontsize=11, fontname="helv", color=(0.2, 0.3, 0.5))
-    page.insert_text((475, y + 78), f"${data['total']:,.2f}", fontsize=12, fontname="helv", color=(0.2, 0.3, 0.5))
+    shape.insert_text((360, y + 78), "TOTAL DUE:", fontsize=11, fontname="helv", color=(0.2, 0.3, 0.5))
+    shape.insert_text((475, y + 78), f"${data['total']:,.2f}", fontsize=12, fontname="helv", color=(0.2, 0.3, 0.5))
     
     # Payment terms
     y += 110
-    page.insert_text((50, y), "Payment Terms: ", fontsize=9, fontname="helv", color=(0.5, 0.5, 0.5))
-    page.insert_text((140, y), data["terms"], fontsize=9, fontname="helv")
+    shape.insert_text((50, y), "Payment Terms: ", fontsize=9, fontname="helv", color=(0.5, 0.5, 0.5))
+    shape.insert_text((140, y), data["terms"], fontsize=9, fontname="helv")
+    
+    shape.commit()
+
+
+# Descriptions that invoice line items are drawn from
+INVOICE_ITEM_DESCS = ["Software License", "Consulting Hours", "Hardware Component", "Support Package", "Training Session", "Custom Development"]
 
 
 def template_invoice():
     items = []
-    for i in range(random.randint(4, 6)):
+    subtotal = 0.0
+    # All item descriptions are drawn in one call
+    for desc in random.choices(INVOICE_ITEM_DESCS, k=random.randint(4, 6)):
         qty = random.randint(1, 50)
         price = round(random.uniform(50, 500), 2)
+        total = round(qty * price, 2)
         items.append({
-            "desc": random.choice(["Software License", "Consulting Hours", "Hardware Component", "Support Package", "Training Session", "Custom Development"]),
+            "desc": desc,
             "qty": qty,
             "price": price,
-            "total": round(qty * price, 2)
+            "total": total
         })
+        subtotal += total
     
-    subtotal = sum(i["total"] for i in items)
     tax_rate = random.choice([7.5, 8.0, 8.5, 9.0])
     
     old_data = {
@@ -345,40 +415,52 @@ def template_invoice():
     
     # NEW version
     new_items = []
+    new_subtotal = 0.0
     for item in items:
-        new_qty = item["qty"] + random.randint(-3, 5)
+        new_qty = max(1, item["qty"] + random.randint(-3, 5))
         new_price = round(item["price"] * random.uniform(0.95, 1.1), 2)
+        new_total = round(new_qty * new_price, 2)
         new_items.append({
             "desc": item["desc"],
-            "qty": max(1, new_qty),
+            "qty": new_qty,
             "price": new_price,
-            "total": round(max(1, new_qty) * new_price, 2)
+            "total": new_total
         })
+        new_subtotal += new_total
     
-    new_subtotal = sum(i["total"] for i in new_items)
     new_tax_rate = tax_rate + 0.5
     
-    new_data = {**old_data}
-    new_data["items"] = new_items
-    new_data["subtotal"] = round(new_subtotal, 2)
-    new_data["tax_rate"] = new_tax_rate
-    new_data["tax"] = round(new_subtotal * new_tax_rate / 100, 2)
-    new_data["shipping"] = round(old_data["shipping"] + 15, 2)
+    new_data = {
+        "invoice_no": old_data["invoice_no"],
+        "date": old_data["date"],
+        "due_date": old_data["due_date"],
+        "client": old_data["client"],
+        "client_addr": old_data["client_addr"],
+        "items": new_items,
+        "subtotal": round(new_subtotal, 2),
+        "tax_rate": new_tax_rate,
+        "tax": round(new_subtotal * new_tax_rate / 100, 2),
+        "shipping": round(old_data["shipping"] + 15, 2),
+        "terms": old_data["terms"]
+    }
     new_data["total"] = round(new_data["subtotal"] + new_data["tax"] + new_data["shipping"], 2)
     
-    return old_data, new_data, render_invoice, "Grid Layout Commercial Invoice"
+    return old_data, new_data
 
 
 # ============================================================================
 # TEMPLATE 4: Financial Report with Charts-like Elements
 # ============================================================================
-def render_financial(page, data, is_new=False):
+def render_financial(page, data):
     """Financial statement with chart-like visual elements."""
+    # Everything is drawn into one Shape and written to the page by a single commit()
+    shape = page.new_shape()
     
     # Clean header
-    page.draw_line((50, 60), (560, 60), color=(0.2, 0.4, 0.6), width=2)
-    page.insert_text((50, 50), f"QUARTERLY FINANCIAL REPORT - {data['quarter']}", fontsize=16, fontname="helv", color=(0.1, 0.3, 0.5))
-    page.insert_text((50, 75), f"Company: {data['company']} | Report Date: {data['date']}", fontsize=9, fontname="helv", color=(0.4, 0.4, 0.4))
+    shape.draw_line((50, 60), (560, 60))
+    shape.finish(color=(0.2, 0.4, 0.6), width=2, closePath=False)
+    shape.insert_text((50, 50), f"QUARTERLY FINANCIAL REPORT - {data['quarter']}", fontsize=16, fontname="helv", color=(0.1, 0.3, 0.5))
+    shape.insert_text((50, 75), f"Company: {data['company']} | Report Date: {data['date']}", fontsize=9, fontname="helv", color=(0.4, 0.4, 0.4))
     
     # Key metrics in boxes
     y = 100
@@ -390,55 +472,62 @@ def render_financial(page, data, is_new=False):
     ]
     
     box_width = 120
-    for i, (label, value, color) in enumerate(metrics):
-        x = 50 + i * 130
-        page.draw_rect(fitz.Rect(x, y, x + box_width, y + 55), fill=color)
-        page.insert_text((x + 10, y + 20), label, fontsize=9, fontname="helv", color=(1, 1, 1))
-        page.insert_text((x + 10, y + 42), f"${value:,.0f}", fontsize=12, fontname="helv", color=(1, 1, 1))
+    for x, (label, value, color) in zip((50, 180, 310, 440), metrics):
+        shape.draw_rect(fitz.Rect(x, y, x + box_width, y + 55))
+        shape.finish(fill=color, color=(0, 0, 0))
+        shape.insert_text((x + 10, y + 20), label, fontsize=9, fontname="helv", color=(1, 1, 1))
+        shape.insert_text((x + 10, y + 42), f"${value:,.0f}", fontsize=12, fontname="helv", color=(1, 1, 1))
     
     # Bar chart simulation for expenses breakdown
     y = 180
-    page.insert_text((50, y), "EXPENSE BREAKDOWN", fontsize=11, fontname="helv", color=(0.2, 0.2, 0.2))
+    shape.insert_text((50, y), "EXPENSE BREAKDOWN", fontsize=11, fontname="helv", color=(0.2, 0.2, 0.2))
     y += 15
     
-    max_exp = max(e["amount"] for e in data["expense_breakdown"])
+    bar_scale = 300 / data["max_expense"]
     for exp in data["expense_breakdown"]:
-        bar_width = (exp["amount"] / max_exp) * 300
-        page.draw_rect(fitz.Rect(150, y, 150 + bar_width, y + 16), fill=(0.3, 0.5, 0.7))
-        page.insert_text((55, y + 12), exp["category"], fontsize=8, fontname="helv")
-        page.insert_text((460, y + 12), f"${exp['amount']:,.0f}", fontsize=8, fontname="helv")
+        bar_width = exp["amount"] * bar_scale
+        shape.draw_rect(fitz.Rect(150, y, 150 + bar_width, y + 16))
+        shape.finish(fill=(0.3, 0.5, 0.7), color=(0, 0, 0))
+        shape.insert_text((55, y + 12), exp["category"], fontsize=8, fontname="helv")
+        shape.insert_text((460, y + 12), f"${exp['amount']:,.0f}", fontsize=8, fontname="helv")
         y += 22
     
     # Assets vs Liabilities comparison
     y += 20
-    page.insert_text((50, y), "BALANCE SHEET SUMMARY", fontsize=11, fontname="helv", color=(0.2, 0.2, 0.2))
+    shape.insert_text((50, y), "BALANCE SHEET SUMMARY", fontsize=11, fontname="helv", color=(0.2, 0.2, 0.2))
     y += 15
     
     # Assets column
-    page.draw_rect(fitz.Rect(50, y, 290, y + 120), color=(0.7, 0.7, 0.7))
-    page.draw_rect(fitz.Rect(50, y, 290, y + 25), fill=(0.2, 0.5, 0.3))
-    page.insert_text((60, y + 17), "ASSETS", fontsize=10, fontname="helv", color=(1, 1, 1))
+    shape.draw_rect(fitz.Rect(50, y, 290, y + 120))
+    shape.finish(color=(0.7, 0.7, 0.7))
+    shape.draw_rect(fitz.Rect(50, y, 290, y + 25))
+    shape.finish(fill=(0.2, 0.5, 0.3), color=(0, 0, 0))
+    shape.insert_text((60, y + 17), "ASSETS", fontsize=10, fontname="helv", color=(1, 1, 1))
     
     ay = y + 30
     for asset in data["assets"]:
-        page.insert_text((60, ay + 12), asset["name"], fontsize=8, fontname="helv")
-        page.insert_text((200, ay + 12), f"${asset['value']:,.0f}", fontsize=8, fontname="helv")
+        shape.insert_text((60, ay + 12), asset["name"], fontsize=8, fontname="helv")
+        shape.insert_text((200, ay + 12), f"${asset['value']:,.0f}", fontsize=8, fontname="helv")
         ay += 18
     
-    page.insert_text((60, y + 105), f"Total: ${data['total_assets']:,.0f}", fontsize=9, fontname="helv", color=(0.2, 0.5, 0.3))
+    shape.insert_text((60, y + 105), f"Total: ${data['total_assets']:,.0f}", fontsize=9, fontname="helv", color=(0.2, 0.5, 0.3))
     
     # Liabilities column
-    page.draw_rect(fitz.Rect(310, y, 560, y + 120), color=(0.7, 0.7, 0.7))
-    page.draw_rect(fitz.Rect(310, y, 560, y + 25), fill=(0.6, 0.2, 0.2))
-    page.insert_text((320, y + 17), "LIABILITIES", fontsize=10, fontname="helv", color=(1, 1, 1))
+    shape.draw_rect(fitz.Rect(310, y, 560, y + 120))
+    shape.finish(color=(0.7, 0.7, 0.7))
+    shape.draw_rect(fitz.Rect(310, y, 560, y + 25))
+    shape.finish(fill=(0.6, 0.2, 0.2), color=(0, 0, 0))
+    shape.insert_text((320, y + 17), "LIABILITIES", fontsize=10, fontname="helv", color=(1, 1, 1))
     
     ly = y + 30
     for liab in data["liabilities"]:
-        page.insert_text((320, ly + 12), liab["name"], fontsize=8, fontname="helv")
-        page.insert_text((470, ly + 12), f"${liab['value']:,.0f}", fontsize=8, fontname="helv")
+        shape.insert_text((320, ly + 12), liab["name"], fontsize=8, fontname="helv")
+        shape.insert_text((470, ly + 12), f"${liab['value']:,.0f}", fontsize=8, fontname="helv")
         ly += 18
     
-    page.insert_text((320, y + 105), f"Total: ${data['total_liabilities']:,.0f}", fontsize=9, fontname="helv", color=(0.6, 0.2, 0.2))
+    shape.insert_text((320, y + 105), f"Total: ${data['total_liabilities']:,.0f}", fontsize=9, fontname="helv", color=(0.6, 0.2, 0.2))
+    
+    shape.commit()
 
 
 def template_financial():
@@ -473,125 +562,118 @@ def template_financial():
         "total_assets": round(revenue * 0.9, 0),
         "total_liabilities": round(revenue * 0.45, 0),
     }
+    # Bar chart scale, computed once here instead of on every render
+    old_data["max_expense"] = max(e["amount"] for e in old_data["expense_breakdown"])
     
     # NEW version with changes
     new_revenue = revenue * random.uniform(1.02, 1.08)
     new_expenses = new_revenue * random.uniform(0.58, 0.82)
     
-    new_data = {**old_data}
-    new_data["revenue"] = round(new_revenue, 0)
-    new_data["expenses"] = round(new_expenses, 0)
-    new_data["net_income"] = round(new_revenue - new_expenses, 0)
-    new_data["ebitda"] = round((new_revenue - new_expenses) * 1.35, 0)
-    new_data["expense_breakdown"] = [
-        {"category": "Salaries & Wages", "amount": round(new_expenses * 0.43, 0)},
-        {"category": "Operations", "amount": round(new_expenses * 0.26, 0)},
-        {"category": "Marketing", "amount": round(new_expenses * 0.16, 0)},
-        {"category": "R&D", "amount": round(new_expenses * 0.11, 0)},
-        {"category": "Admin & Other", "amount": round(new_expenses * 0.04, 0)},
-    ]
-    new_data["assets"] = [
-        {"name": "Cash & Securities", "value": round(new_revenue * 0.32, 0)},
-        {"name": "Accounts Receivable", "value": round(new_revenue * 0.18, 0)},
-        {"name": "Property & Equipment", "value": round(new_revenue * 0.42, 0)},
-    ]
-    new_data["total_assets"] = round(new_revenue * 0.92, 0)
-    new_data["total_liabilities"] = round(new_revenue * 0.42, 0)
+    new_data = {
+        "quarter": old_data["quarter"],
+        "company": old_data["company"],
+        "date": old_data["date"],
+        "revenue": round(new_revenue, 0),
+        "expenses": round(new_expenses, 0),
+        "net_income": round(new_revenue - new_expenses, 0),
+        "ebitda": round((new_revenue - new_expenses) * 1.35, 0),
+        "expense_breakdown": [
+            {"category": "Salaries & Wages", "amount": round(new_expenses * 0.43, 0)},
+            {"category": "Operations", "amount": round(new_expenses * 0.26, 0)},
+            {"category": "Marketing", "amount": round(new_expenses * 0.16, 0)},
+            {"category": "R&D", "amount": round(new_expenses * 0.11, 0)},
+            {"category": "Admin & Other", "amount": round(new_expenses * 0.04, 0)},
+        ],
+        "assets": [
+            {"name": "Cash & Securities", "value": round(new_revenue * 0.32, 0)},
+            {"name": "Accounts Receivable", "value": round(new_revenue * 0.18, 0)},
+            {"name": "Property & Equipment", "value": round(new_revenue * 0.42, 0)},
+        ],
+        "liabilities": old_data["liabilities"],
+        "total_assets": round(new_revenue * 0.92, 0),
+        "total_liabilities": round(new_revenue * 0.42, 0),
+    }
+    new_data["max_expense"] = max(e["amount"] for e in new_data["expense_breakdown"])
     
-    return old_data, new_data, render_financial, "Financial Report with Visual Charts"
+    return old_data, new_data
 
 
 # ============================================================================
 # TEMPLATE 5: Tax Form with Form Fields Layout
 # ============================================================================
-def render_tax(page, data, is_new=False):
+def render_tax(page, data):
     """Tax form with official form field layout."""
+    # Everything is drawn into one Shape and written to the page by a single commit()
+    shape = page.new_shape()
     
     # Official form header
-    page.draw_rect(fitz.Rect(50, 40, 560, 100), color=(0, 0, 0), width=1.5)
-    page.insert_text((60, 60), "FORM 1040-EZ", fontsize=14, fontname="helv")
-    page.insert_text((200, 60), "U.S. Individual Income Tax Return", fontsize=12, fontname="helv")
-    page.insert_text((60, 80), f"Tax Year: {data['tax_year']}", fontsize=10, fontname="helv")
-    page.insert_text((350, 80), f"SSN: XXX-XX-{data['ssn_last4']}", fontsize=10, fontname="helv")
-    
-    # Form fields with boxes
-    y = 120
-    
-    # Section A: Income
-    page.draw_rect(fitz.Rect(50, y, 560, y + 20), fill=(0.9, 0.9, 0.9))
-    page.insert_text((55, y + 14), "SECTION A: INCOME", fontsize=10, fontname="helv")
-    y += 25
-    
-    fields_income = [
-        ("1", "Wages, salaries, tips (W-2)", data["wages"]),
-        ("2", "Taxable interest", data["interest"]),
-        ("3", "Unemployment compensation", data["unemployment"]),
-        ("4", "Adjusted Gross Income (add lines 1-3)", data["agi"]),
-    ]
-    
-    for line, desc, value in fields_income:
-        page.draw_rect(fitz.Rect(50, y, 80, y + 20), color=(0, 0, 0), width=0.5)
-        page.insert_text((60, y + 14), line, fontsize=9, fontname="helv")
-        page.insert_text((90, y + 14), desc, fontsize=9, fontname="helv")
-        page.draw_rect(fitz.Rect(450, y, 560, y + 20), color=(0, 0, 0), width=0.5)
-        page.insert_text((460, y + 14), f"${value:,.2f}", fontsize=9, fontname="helv")
-        y += 24
-    
-    # Section B: Deductions
-    y += 10
-    page.draw_rect(fitz.Rect(50, y, 560, y + 20), fill=(0.9, 0.9, 0.9))
-    page.insert_text((55, y + 14), "SECTION B: DEDUCTIONS & EXEMPTIONS", fontsize=10, fontname="helv")
-    y += 25
-    
-    fields_ded = [
-        ("5", "Standard deduction", data["std_deduction"]),
-        ("6", "Personal exemption", data["exemption"]),
-        ("7", "Taxable income (line 4 minus lines 5-6)", data["taxable_income"]),
+    shape.draw_rect(fitz.Rect(50, 40, 560, 100))
+    shape.finish(color=(0, 0, 0), width=1.5)
+    shape.insert_text((60, 60), "FORM 1040-EZ", fontsize=14, fontname="helv")
+    shape.insert_text((200, 60), "U.S. Individual Income Tax Return", fontsize=12, fontname="helv")
+    shape.insert_text((60, 80), f"Tax Year: {data['tax_year']}", fontsize=10, fontname="helv")
+    shape.insert_text((350, 80), f"SSN: XXX-XX-{data['ssn_last4']}", fontsize=10, fontname="helv")
+    
+    # Form fields with boxes, one grey header bar per section
+    sections = [
+        ("SECTION A: INCOME", [
+            ("1", "Wages, salaries, tips (W-2)", data["wages"]),
+            ("2", "Taxable interest", data["interest"]),
+            ("3", "Unemployment compensation", data["unemployment"]),
+            ("4", "Adjusted Gross Income (add lines 1-3)", data["agi"]),
+        ]),
+        ("SECTION B: DEDUCTIONS & EXEMPTIONS", [
+            ("5", "Standard deduction", data["std_deduction"]),
+            ("6", "Personal exemption", data["exemption"]),
+            ("7", "Taxable income (line 4 minus lines 5-6)", data["taxable_income"]),
+        ]),
+        ("SECTION C: TAX COMPUTATION", [
+            ("8", f"Tax from table (rate: {data['tax_rate']}%)", data["tax_from_table"]),
+            ("9", "Federal income tax withheld", data["withheld"]),
+            ("10", "Earned income credit", data["eic"]),
+        ]),
     ]
     
-    for line, desc, value in fields_ded:
-        page.draw_rect(fitz.Rect(50, y, 80, y + 20), color=(0, 0, 0), width=0.5)
-        page.insert_text((60, y + 14), line, fontsize=9, fontname="helv")
-        page.insert_text((90, y + 14), desc, fontsize=9, fontname="helv")
-        page.draw_rect(fitz.Rect(450, y, 560, y + 20), color=(0, 0, 0), width=0.5)
-        page.insert_text((460, y + 14), f"${value:,.2f}", fontsize=9, fontname="helv")
-        y += 24
-    
-    # Section C: Tax Computation
-    y += 10
-    page.draw_rect(fitz.Rect(50, y, 560, y + 20), fill=(0.9, 0.9, 0.9))
-    page.insert_text((55, y + 14), "SECTION C: TAX COMPUTATION", fontsize=10, fontname="helv")
-    y += 25
-    
-    fields_tax = [
-        ("8", f"Tax from table (rate: {data['tax_rate']}%)", data["tax_from_table"]),
-        ("9", "Federal income tax withheld", data["withheld"]),
-        ("10", "Earned income credit", data["eic"]),
-    ]
-    
-    for line, desc, value in fields_tax:
-        page.draw_rect(fitz.Rect(50, y, 80, y + 20), color=(0, 0, 0), width=0.5)
-        page.insert_text((60, y + 14), line, fontsize=9, fontname="helv")
-        page.insert_text((90, y + 14), desc, fontsize=9, fontname="helv")
-        page.draw_rect(fitz.Rect(450, y, 560, y + 20), color=(0, 0, 0), width=0.5)
-        page.insert_text((460, y + 14), f"${value:,.2f}", fontsize=9, fontname="helv")
-        y += 24
+    # Sections are 10pt apart; the first header sits at y=120
+    y = 110
+    for title, fields in sections:
+        y += 10
+        shape.draw_rect(fitz.Rect(50, y, 560, y + 20))
+        shape.finish(fill=(0.9, 0.9, 0.9), color=(0, 0, 0))
+        shape.insert_text((55, y + 14), title, fontsize=10, fontname="helv")
+        y += 25
+        
+        for line, desc, value in fields:
+            shape.draw_rect(fitz.Rect(50, y, 80, y + 20))
+            shape.insert_text((60, y + 14), line, fontsize=9, fontname="helv")
+            shape.insert_text((90, y + 14), desc, fontsize=9, fontname="helv")
+            shape.draw_rect(fitz.Rect(450, y, 560, y + 20))
+            shape.insert_text((460, y + 14), f"${value:,.2f}", fontsize=9, fontname="helv")
+            y += 24
+        # All field boxes of a section are stroked as one path
+        shape.finish(color=(0, 0, 0), width=0.5)
     
     # Final result box
     y += 15
     if data["refund"] > 0:
-        page.draw_rect(fitz.Rect(300, y, 560, y + 40), fill=(0.85, 0.95, 0.85), color=(0, 0.5, 0), width=2)
-        page.insert_text((320, y + 25), f"REFUND DUE: ${data['refund']:,.2f}", fontsize=12, fontname="helv", color=(0, 0.4, 0))
+        shape.draw_rect(fitz.Rect(300, y, 560, y + 40))
+        shape.finish(fill=(0.85, 0.95, 0.85), color=(0, 0.5, 0), width=2)
+        shape.insert_text((320, y + 25), f"REFUND DUE: ${data['refund']:,.2f}", fontsize=12, fontname="helv", color=(0, 0.4, 0))
     else:
-        page.draw_rect(fitz.Rect(300, y, 560, y + 40), fill=(1, 0.9, 0.9), color=(0.7, 0, 0), width=2)
-        page.insert_text((320, y + 25), f"AMOUNT OWED: ${abs(data['refund']):,.2f}", fontsize=12, fontname="helv", color=(0.6, 0, 0))
+        shape.draw_rect(fitz.Rect(300, y, 560, y + 40))
+        shape.finish(fill=(1, 0.9, 0.9), color=(0.7, 0, 0), width=2)
+        shape.insert_text((320, y + 25), f"AMOUNT OWED: ${abs(data['refund']):,.2f}", fontsize=12, fontname="helv", color=(0.6, 0, 0))
     
     # Signature line
     y += 60
-    page.draw_line((50, y), (250, y), color=(0, 0, 0), width=0.5)
-    page.insert_text((50, y + 12), "Taxpayer Signature", fontsize=8, fontname="helv")
-    page.draw_line((350, y), (500, y), color=(0, 0, 0), width=0.5)
-    page.insert_text((350, y + 12), "Date", fontsize=8, fontname="helv")
+    shape.draw_line((50, y), (250, y))
+    shape.finish(color=(0, 0, 0), width=0.5, closePath=False)
+    shape.insert_text((50, y + 12), "Taxpayer Signature", fontsize=8, fontname="helv")
+    shape.draw_line((350, y), (500, y))
+    shape.finish(color=(0, 0, 0), width=0.5, closePath=False)
+    shape.insert_text((350, y + 12), "Date", fontsize=8, fontname="helv")
+    
+    shape.commit()
 
 
 def template_tax():
@@ -615,7 +697,7 @@ def template_tax():
     }
     
     new_wages = wages * random.uniform(1.02, 1.06)
-    new_data = {**old_data}
+    new_data = old_data.copy()
     new_data["wages"] = round(new_wages, 2)
     new_data["interest"] = round(old_data["interest"] + random.uniform(50, 300), 2)
     new_data["agi"] = round(new_data["wages"] + new_data["interest"], 2)
@@ -626,7 +708,20 @@ def template_tax():
     new_data["withheld"] = round(new_wages * 0.19, 2)
     new_data["refund"] = round(new_data["withheld"] - new_data["tax_from_table"], 2)
     
-    return old_data, new_data, render_tax, "Official Tax Form Layout"
+    return old_data, new_data
+
+
+# ============================================================================
+# TEMPLATE REGISTRY
+# ============================================================================
+# name -> (data factory returning (old_data, new_data), renderer, title)
+TEMPLATES = {
+    "payroll": (template_payroll, render_payroll, "Multi-Column Payroll Statement"),
+    "insurance": (template_insurance, render_insurance, "Insurance Policy with Visual Bars"),
+    "invoice": (template_invoice, render_invoice, "Grid Layout Commercial Invoice"),
+    "financial": (template_financial, render_financial, "Financial Report with Visual Charts"),
+    "tax": (template_tax, render_tax, "Official Tax Form Layout"),
+}
 
 
 # ============================================================================
@@ -635,17 +730,9 @@ def template_tax():
 def main():
     """Generate random old/new PDF pair from 5 diverse templates."""
     
-    templates = [
-        template_payroll,
-        template_insurance,
-        template_invoice,
-        template_financial,
-        template_tax,
-    ]
-    
     # Randomly select template
-    template_func = random.choice(templates)
-    old_data, new_data, render_func, template_name = template_func()
+    template_func, render_func, template_name = TEMPLATES[random.choice(list(TEMPLATES))]
+    old_data, new_data = template_func()
     
     print(f"\n{'='*60}")
     print(f"SELECTED TEMPLATE: {template_name}")
@@ -662,7 +749,7 @@ def main():
     # Create NEW PDF
     doc_new = fitz.open()
     page_new = doc_new.new_page(width=612, height=792)
-    render_func(page_new, new_data, is_new=True)
+    render_func(page_new, new_data)
     doc_new.save("sample_new.pdf")
     doc_new.close()
     print("Created: sample_new.pdf")